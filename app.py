@@ -7,9 +7,14 @@ Como usar:
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
+import os
 import threading
-import time
-from chatbot import get_response
+from chatbot import iter_response, warm_up
+from chatview import Message, MessageList, Palette
+from dispatcher import ResponseDispatcher
+from history import HistoryStore
+from lagmonitor import LagMonitor
+from msgindex import MessageIndex
 
 VALID_USERS = {
     "Maria": "1234",
@@ -19,13 +24,34 @@ VALID_USERS = {
     "Mariana": "1234",
 }
 
+# Atraso simulado (segundos) antes de mostrar cada resposta; CHATTI_DELAY=0 desliga.
+RESPONSE_DELAY = float(os.environ.get("CHATTI_DELAY", "1.2"))
+
+# Histórico das conversas (SQLite); o chat abre com a última página e carrega as anteriores ao rolar para cima.
+HISTORY_PATH = os.environ.get("CHATTI_HISTORY", os.path.join(os.path.expanduser("~"), ".chatti_history.sqlite3"))
+HISTORY_PAGE = 50
+
+# Arquivo (JSON por linha) para o resumo periódico do monitor de responsividade; F12 mostra o painel.
+MONITOR_LOG = os.environ.get("CHATTI_MONITOR_LOG")
+
 
 class ChatBotApp:
-    def __init__(self, root):
+    def __init__(self, root, response_delay=RESPONSE_DELAY):
         self.root = root
         self.root.title("ChatTI — Simulador de Chatbot")
         self.root.geometry("800x600")
         self.user_name = None
+        self.history = None
+        self._oldest_id = None
+        self._streaming = None
+        self.search_index = MessageIndex()
+        self._matches = []
+        self._match_pos = -1
+        self.monitor = LagMonitor(root, log_path=MONITOR_LOG)
+        self.monitor.start()
+        self.dispatcher = ResponseDispatcher(root, iter_response, delay=response_delay,
+                                             registry=self.monitor.registry)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self.themes = {
             "light": {
@@ -34,6 +60,7 @@ class ChatBotApp:
                 "user_bg": "#FFB6C1",  
                 "bot_bg": "#FFC0CB",  
                 "input_bg": "#ffffff",
+                "match_bg": "#FFFACD",
             },
             "dark": {
                 "bg": "#4A4454",  
@@ -41,6 +68,7 @@ class ChatBotApp:
                 "user_bg": "#DB7093",  
                 "bot_bg": "#C71585", 
                 "input_bg": "#483D8B",  
+                "match_bg": "#6A5ACD",
             },
         }
         self.current_theme = "light"
@@ -54,6 +82,10 @@ class ChatBotApp:
         }
 
         self._build_login()
+        # A base do chatbot é carregada em segundo plano depois que a tela de login aparece.
+        self.root.after_idle(
+            lambda: threading.Thread(target=warm_up, name="chatti-warmup", daemon=True).start()
+        )
 
     def _build_login(self):
         self.root.configure(bg="#FFF0F5")  
@@ -155,29 +187,43 @@ class ChatBotApp:
         btn_frame = ttk.Frame(top_frame)
         btn_frame.pack(side="right")
 
-        self.theme_btn = ttk.Button(btn_frame, text="Alternar Tema", command=self._toggle_theme)
+        self.theme_btn = ttk.Button(btn_frame, text="Alternar Tema", command=self.monitor.wrap("tema", self._toggle_theme))
         self.theme_btn.pack(side="left", padx=4)
 
-        clear_btn = ttk.Button(btn_frame, text="Limpar", command=self._clear_messages)
+        clear_btn = ttk.Button(btn_frame, text="Limpar", command=self.monitor.wrap("limpar", self._clear_messages))
         clear_btn.pack(side="left", padx=4)
 
+        # Busca no histórico: Ctrl+F foca o campo, Enter/Shift+Enter vão para o próximo/anterior.
+        next_match = self.monitor.wrap("busca", self._next_match)
+        search_frame = ttk.Frame(top_frame)
+        search_frame.pack(side="right", padx=8)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=20)
+        self.search_entry.pack(side="left")
+        ttk.Button(search_frame, text="◀", width=2, command=lambda: next_match(-1)).pack(side="left", padx=(4, 0))
+        ttk.Button(search_frame, text="▶", width=2, command=lambda: next_match(1)).pack(side="left")
+        self.match_label = ttk.Label(search_frame, text="", width=9)
+        self.match_label.pack(side="left", padx=(4, 0))
+        self.search_var.trace_add("write", self.monitor.wrap("busca", lambda *a: self._on_search()))
+        self.search_entry.bind("<Return>", lambda e: next_match(1))
+        self.search_entry.bind("<Shift-Return>", lambda e: next_match(-1))
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        self.root.bind("<Control-f>", lambda e: self.search_entry.focus_set())
+
         container = ttk.Frame(self.root)
         container.pack(fill="both", expand=True, padx=8, pady=(0,8))
 
-        self.canvas = tk.Canvas(container, highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.palette = Palette(self.themes, self.current_theme)
+        self.message_list = MessageList(container, self.palette, self.fonts)
+        self.message_list.pack()
+        self.message_list.on_top = self.monitor.wrap("historico", self._load_older_page)
+        scheduler = self.message_list.scheduler
+        scheduler.flush = self.monitor.wrap("render", scheduler.flush)
+        self._on_response = self.monitor.wrap("resposta", self._show_response)
+        self._on_chunk = self.monitor.wrap("trecho", self._show_chunk)
 
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        self.typing_label = ttk.Label(self.root, text="", padding=(10, 0))
+        self.typing_label.pack(anchor="w")
 
         input_frame = ttk.Frame(self.root, padding=8)
         input_frame.pack(fill="x")
@@ -185,84 +231,125 @@ class ChatBotApp:
         self.msg_var = tk.StringVar()
         self.input_entry = ttk.Entry(input_frame, textvariable=self.msg_var)
         self.input_entry.pack(side="left", fill="x", expand=True, padx=(0,8))
-        self.input_entry.bind("<Return>", lambda e: self._on_send())
+        self.input_entry.bind("<Return>", self.monitor.wrap("enviar", lambda e: self._on_send()))
 
-        send_btn = ttk.Button(input_frame, text="Enviar", command=self._on_send)
+        send_btn = ttk.Button(input_frame, text="Enviar", command=self.monitor.wrap("enviar", self._on_send))
         send_btn.pack(side="left")
 
         self._apply_theme_to_widgets()
 
-        self._add_bot_message("Olá! Sou o ChatTI. Pergunte algo sobre Tecnologia da Informação (TI).")
+        self.history = HistoryStore(HISTORY_PATH)
+        rows = self.history.load_page(self.user_name, limit=HISTORY_PAGE)
+        for row in rows:
+            message = Message(row.role, row.name, row.text, row.ts)
+            self.message_list.append(message)
+            self.search_index.add(message)
+        self._oldest_id = rows[0].id if len(rows) == HISTORY_PAGE else None
 
-    def _add_message_widget(self, name, text, is_user=False):
-        
-        frame = tk.Frame(self.scrollable_frame, bg=self.themes[self.current_theme]["bg"])
-        frame.pack(fill="x", pady=6, padx=6)
-
-        avatar = tk.Canvas(frame, width=40, height=40, highlightthickness=0, bg=self.themes[self.current_theme]["bg"])
-        avatar_side = "right" if is_user else "left"
-        avatar.pack(side=avatar_side, padx=6)
-        avatar_color = self.themes[self.current_theme]["user_bg"] if is_user else self.themes[self.current_theme]["bot_bg"]
-        text_color = self.themes[self.current_theme]["fg"]
-        avatar.create_oval(4, 4, 36, 36, fill=avatar_color, outline=avatar_color)
-        initial = (name[0] if name else "?").upper()
-        avatar.create_text(20, 20, text=initial, fill=text_color, font=self.fonts["name"])
-
-        bubble_bg = avatar_color
-        bubble_frame = tk.Frame(frame, bg=bubble_bg, bd=0)
-
-        ts = time.strftime("%H:%M")
-        name_lbl = tk.Label(bubble_frame, text=name, bg=bubble_bg, fg=text_color, font=self.fonts["name"])
-        name_lbl.pack(anchor="w", padx=6, pady=(6,0))
-        text_lbl = tk.Label(bubble_frame, text=text, wraplength=520, justify="left", bg=bubble_bg, fg=text_color, font=self.fonts["msg"], padx=6, pady=4)
-        text_lbl.pack(anchor="w", padx=6)
-        time_lbl = tk.Label(bubble_frame, text=ts, bg=bubble_bg, fg=text_color, font=self.fonts["time"])
-        time_lbl.pack(anchor="e", padx=6, pady=(0,6))
-
-        if is_user:
-            bubble_frame.pack(side="right", padx=(0,10))
-        else:
-            bubble_frame.pack(side="left", padx=(10,0))
+        self._add_bot_message("Olá! Sou o ChatTI. Pergunte algo sobre Tecnologia da Informação (TI).")
 
-        self.root.update_idletasks()
-        self.canvas.yview_moveto(1.0)
+    def _add_message_widget(self, name, text, is_user=False, save=False):
+        message = Message("user" if is_user else "bot", name, text)
+        self.message_list.append(message)
+        self.search_index.add(message)
+        if save:
+            self.history.append(self.user_name, message.role, message.name, message.text, message.ts)
+        return message
 
     def _add_user_message(self, text):
-        self._add_message_widget(self.user_name, text, is_user=True)
+        return self._add_message_widget(self.user_name, text, is_user=True, save=True)
+
+    def _add_bot_message(self, text, save=False):
+        return self._add_message_widget("ChatTI", text, is_user=False, save=save)
 
-    def _add_bot_message(self, text):
-        self._add_message_widget("ChatTI", text, is_user=False)
+    def _load_older_page(self, limit=HISTORY_PAGE):
+        if self._oldest_id is None:
+            return
+        rows = self.history.load_page(self.user_name, before_id=self._oldest_id, limit=limit)
+        messages = [Message(row.role, row.name, row.text, row.ts) for row in rows]
+        self.message_list.prepend(messages)
+        self.search_index.add_older(messages)
+        self._oldest_id = rows[0].id if len(rows) == limit else None
+
+    def _on_search(self):
+        query = self.search_var.get()
+        if query.strip():
+            # A busca cobre todo o histórico: as páginas ainda não lidas entram no
+            # modelo e no índice (sem widgets) na primeira busca.
+            while self._oldest_id is not None:
+                self._load_older_page(limit=1000)
+        self._matches = self.search_index.search(query)
+        self._match_pos = len(self._matches) - 1
+        if self._matches:
+            self._jump_to_match()
+        else:
+            self.message_list.highlight(None)
+            self.match_label.configure(text="0/0" if query.strip() else "")
+
+    def _next_match(self, step):
+        if not self._matches:
+            return
+        self._match_pos = (self._match_pos + step) % len(self._matches)
+        self._jump_to_match()
+
+    def _jump_to_match(self):
+        self.message_list.reveal(self._matches[self._match_pos])
+        self.match_label.configure(text=f"{self._match_pos + 1}/{len(self._matches)}")
 
     def _on_send(self):
         text = self.msg_var.get().strip()
         if not text:
             return
+        if self.dispatcher.pending >= self.dispatcher.max_pending:
+            self.typing_label.configure(text="Aguarde as respostas pendentes antes de enviar mais mensagens.")
+            return
         self.msg_var.set("")
         self._add_user_message(text)
 
-        typing_label = ttk.Label(self.scrollable_frame, text="ChatTI está digitando...", padding=6)
-        typing_label.pack(anchor="w", padx=10, pady=2)
-        self.canvas.yview_moveto(1.0)
-
-        def worker():
-            delay = 0.8 + (0.8 * (0.5))
-            time.sleep(delay)
-            resp = get_response(text)
-
-            def show_response():
-                typing_label.destroy()
-                self._add_bot_message(resp)
-
-            self.root.after(0, show_response)
-
-        threading.Thread(target=worker, daemon=True).start()
+        self.typing_label.configure(text="ChatTI está digitando...")
+        self.dispatcher.submit(text, self._on_response, on_chunk=self._on_chunk)
+
+    def _show_chunk(self, chunk):
+        if self._streaming is None:
+            self._streaming = self._add_bot_message("")
+        self._streaming.text += chunk
+        self.message_list.touch(self._streaming)
+
+    def _show_response(self, resp):
+        message, self._streaming = self._streaming, None
+        if isinstance(resp, Exception):
+            resp = "Desculpe, ocorreu um erro interno ao gerar a resposta."
+        if not self.dispatcher.pending:
+            self.typing_label.configure(text="")
+        if message is None:
+            self._add_bot_message(resp, save=True)
+            return
+        message.text = resp
+        self.message_list.touch(message)
+        self.search_index.update(message)
+        self.history.append(self.user_name, message.role, message.name, message.text, message.ts)
 
     def _clear_messages(self):
-        for child in list(self.scrollable_frame.winfo_children()):
-            child.destroy()
+        self.dispatcher.cancel_all()
+        self._streaming = None
+        self.typing_label.configure(text="")
+        self.message_list.clear()
+        self.search_index.clear()
+        self._matches = []
+        self.match_label.configure(text="")
+        self.history.clear(self.user_name)
+        self._oldest_id = None
         
         self._add_bot_message("Conversa limpa. Em que posso ajudar sobre TI?")
 
+    def _on_close(self):
+        self.dispatcher.shutdown()
+        if self.history:
+            self.history.close()
+        if self.monitor.log_path:
+            self.monitor.write_log()
+        self.root.destroy()
+
    
     def _toggle_theme(self):
         self.current_theme = "dark" if self.current_theme == "light" else "light"
@@ -271,47 +358,7 @@ class ChatBotApp:
     def _apply_theme_to_widgets(self):
         colors = self.themes[self.current_theme]
         self.root.configure(bg=colors["bg"]) 
-        
-        try:
-            self.canvas.configure(bg=colors["bg"]) 
-            self.scrollable_frame.configure(bg=colors["bg"]) 
-            for msg_frame in self.scrollable_frame.winfo_children():
-                try:
-                    msg_frame.configure(bg=colors["bg"]) 
-                except Exception:
-                    pass
-                
-                bubble = None
-                avatar = None
-                for w in msg_frame.winfo_children():
-                    if isinstance(w, tk.Frame):
-                        bubble = w
-                    elif isinstance(w, tk.Canvas):
-                        avatar = w
-
-                name = None
-                if bubble:
-                    
-                    for sub in bubble.winfo_children():
-                        if isinstance(sub, tk.Label):
-                            name = sub.cget("text")
-                            break
-                    bubble_bg = colors["user_bg"] if name == self.user_name else colors["bot_bg"]
-                   
-                    for sub in bubble.winfo_children():
-                        if isinstance(sub, tk.Label):
-                            sub.configure(bg=bubble_bg, fg=colors["fg"]) 
-
-                if avatar:
-                    avatar.configure(bg=colors["bg"])
-                    avatar.delete("all")
-                  
-                    avatar_color = colors["user_bg"] if name == self.user_name else colors["bot_bg"]
-                    avatar.create_oval(4, 4, 36, 36, fill=avatar_color, outline=avatar_color)
-                    initial = (name[0] if name else "?").upper()
-                    avatar.create_text(20, 20, text=initial, fill=colors["fg"], font=self.fonts["name"])
-        except Exception:
-            pass
+        self.palette.apply(self.current_theme)
 
 
 if __name__ == "__main__":
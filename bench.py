@@ -0,0 +1,244 @@
+"""Benchmark do motor de respostas (`chatbot.get_response`), só com a biblioteca padrão.
+
+Como usar:
+ - `python bench.py` mede cada categoria do corpus sintético e imprime a tabela.
+ - `python bench.py --save bench_baseline.json` grava a linha de base.
+ - `python bench.py --baseline bench_baseline.json` compara com ela e sai com
+   código 1 se alguma categoria ficar mais lenta que a tolerância (`--tolerance`).
+ - `python bench.py --startup` mede, em processos novos, a importação a frio de
+   `chatbot` (com `-X importtime`) e o tempo até a janela de login de `app.py`, e
+   sai com código 1 se algum passar do orçamento (`--import-budget`, `--login-budget`).
+
+O corpus cobre todos os ramos: erros (curtos e tracebacks de vários KB),
+"como instalar" e "o que é" com chave exata, com erro de digitação e
+desconhecida, tópicos, comandos de rede e a resposta genérica, em vários
+tamanhos de mensagem.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import chatbot
+from metrics import Histogram
+
+
+_FILLER = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit")
+_UNKNOWN = ("kubernetes", "terraform", "ansible", "graphql", "webassembly", "quantum")
+_SIZES = (0, 1024, 4096)
+
+# Módulos que `import chatbot` não deve carregar: só são necessários no primeiro uso.
+_LAZY_MODULES = ("argparse", "concurrent.futures.process", "difflib", "random", "tempfile", "tkinter")
+
+# Orçamentos padrão (ms) da inicialização, usados por `--startup` e por tests/test_startup.py.
+IMPORT_BUDGET_MS = 40.0
+LOGIN_BUDGET_MS = 300.0
+
+_LOGIN_SCRIPT = """
+import time
+started = time.perf_counter()
+import tkinter as tk
+import app
+root = tk.Tk()
+app.ChatBotApp(root)
+root.update()
+print((time.perf_counter() - started) * 1000.0)
+root.destroy()
+"""
+
+
+def _typo(word, rnd):
+    if len(word) < 3:
+        return word + word[-1]
+    i = rnd.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _pad(text, size, rnd):
+    words = [text]
+    length = len(text)
+    while length < size:
+        word = rnd.choice(_FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _traceback(size, rnd):
+    lines = ["Traceback (most recent call last):"]
+    while sum(len(l) + 1 for l in lines) < size:
+        n = rnd.randrange(1, 500)
+        lines.append(f'  File "/app/modulo_{n}.py", line {n}, in funcao_{n}')
+        lines.append(f"    resultado = processa(dados[{n}])")
+    lines.append("ValueError: valor inválido")
+    return "\n".join(lines)
+
+
+def make_corpus(per_category=50, seed=1):
+    """Gera {categoria: [mensagens]} de forma determinística."""
+    rnd = random.Random(seed)
+    kb = sorted(chatbot.knowledge().kb)
+    defs = sorted(chatbot.knowledge().defs)
+    makers = {
+        "error": lambda size: _pad(f"deu erro ao rodar o {rnd.choice(kb)}", size, rnd),
+        "error_traceback": lambda size: _traceback(max(size, 512), rnd),
+        "howto_exact": lambda size: _pad(f"como instalar {rnd.choice(kb)}", size, rnd),
+        "howto_typo": lambda size: _pad(f"como instalar {_typo(rnd.choice(kb), rnd)}", size, rnd),
+        "howto_unknown": lambda size: _pad(f"como usar {rnd.choice(_UNKNOWN)}", size, rnd),
+        "definition_exact": lambda size: _pad(f"o que é {rnd.choice(defs)}", size, rnd),
+        "definition_typo": lambda size: _pad(f"o que é {_typo(rnd.choice(defs), rnd)}", size, rnd),
+        "definition_unknown": lambda size: _pad(f"o que é {rnd.choice(_UNKNOWN)}", size, rnd),
+        "topic": lambda size: _pad(f"me ajuda com {rnd.choice(kb)}", size, rnd),
+        "network": lambda size: _pad(f"rodei ping {rnd.randrange(1, 255)}.0.0.1 e nada", size, rnd),
+        "generic": lambda size: _pad("bom dia, tudo bem com voce", size, rnd),
+    }
+    corpus = {}
+    for name, make in makers.items():
+        for size in _SIZES:
+            corpus[f"{name}@{size}"] = [make(size) for _ in range(per_category)]
+    return corpus
+
+
+def run(corpus, repeat=3, warmup=1):
+    """Mede cada categoria; retorna {categoria: {ops_s, p50_us, p95_us, p99_us}}."""
+    rng = random.Random(0)
+    results = {}
+    for name, messages in corpus.items():
+        for _ in range(warmup):
+            for m in messages:
+                chatbot.get_response(m, rng=rng)
+        hist = Histogram()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for m in messages:
+                t0 = time.perf_counter()
+                chatbot.get_response(m, rng=rng)
+                hist.record((time.perf_counter() - t0) * 1e6)
+        elapsed = time.perf_counter() - started
+        snap = hist.snapshot()
+        results[name] = {
+            "ops_s": snap["count"] / elapsed,
+            "p50_us": snap["p50"],
+            "p95_us": snap["p95"],
+            "p99_us": snap["p99"],
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Lista de (categoria, métrica, base, atual) que pioraram além da tolerância."""
+    regressions = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if cur["ops_s"] < base["ops_s"] * (1 - tolerance):
+            regressions.append((name, "ops_s", base["ops_s"], cur["ops_s"]))
+        for key in ("p50_us", "p95_us"):
+            if cur[key] > base[key] * (1 + tolerance):
+                regressions.append((name, key, base[key], cur[key]))
+    return regressions
+
+
+def _python(*args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=here)
+
+
+def import_time(module="chatbot"):
+    """(ms, módulos adiados que foram carregados) da importação a frio de `module`."""
+    check = f"import {module}, sys; print(*[m for m in {_LAZY_MODULES!r} if m in sys.modules])"
+    proc = _python("-X", "importtime", "-c", check)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip())
+    for line in reversed(proc.stderr.splitlines()):
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000.0, proc.stdout.split()
+    raise RuntimeError(f"{module} não aparece na saída de -X importtime")
+
+
+def login_time():
+    """Ms do início do processo até a janela de login desenhada; None sem display."""
+    proc = _python("-c", _LOGIN_SCRIPT)
+    if proc.returncode:
+        if "TclError" in proc.stderr:
+            return None
+        raise RuntimeError(proc.stderr.strip())
+    return float(proc.stdout)
+
+
+def check_startup(import_budget, login_budget, repeat=3, out=sys.stdout):
+    """Mede a inicialização (melhor de `repeat` execuções); retorna a lista de falhas."""
+    failures = []
+    runs = [import_time() for _ in range(repeat)]
+    ms = min(t for t, _ in runs)
+    loaded = sorted({m for _, mods in runs for m in mods})
+    out.write(f"import chatbot: {ms:.1f} ms (orçamento {import_budget:.0f} ms)\n")
+    if ms > import_budget:
+        failures.append(f"import chatbot levou {ms:.1f} ms")
+    if loaded:
+        failures.append(f"import chatbot carregou {', '.join(loaded)}")
+
+    logins = [login_time() for _ in range(repeat)]
+    if None in logins:
+        out.write("janela de login: sem display, não medida\n")
+    else:
+        ms = min(logins)
+        out.write(f"janela de login: {ms:.1f} ms (orçamento {login_budget:.0f} ms)\n")
+        if ms > login_budget:
+            failures.append(f"janela de login levou {ms:.1f} ms")
+    return failures
+
+
+def print_table(results, out=sys.stdout):
+    out.write(f"{'categoria':<26}{'ops/s':>12}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}\n")
+    for name, r in results.items():
+        out.write(f"{name:<26}{r['ops_s']:>12.0f}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}{r['p99_us']:>10.1f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do motor de respostas do ChatTI")
+    parser.add_argument("-n", "--per-category", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="grava os resultados como linha de base (JSON)")
+    parser.add_argument("--baseline", help="compara com uma linha de base gravada")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="piora relativa aceitável antes de acusar regressão (padrão: 0.25)")
+    parser.add_argument("--startup", action="store_true",
+                        help="mede a inicialização (importação e janela de login) em vez do motor")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, help="ms para importar chatbot")
+    parser.add_argument("--login-budget", type=float, default=LOGIN_BUDGET_MS, help="ms até a janela de login")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        failures = check_startup(args.import_budget, args.login_budget, repeat=args.repeat)
+        for failure in failures:
+            print(f"ACIMA DO ORÇAMENTO: {failure}")
+        return 1 if failures else 0
+
+    results = run(make_corpus(args.per_category, args.seed), repeat=args.repeat)
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, metric, base, cur in regressions:
+            print(f"REGRESSÃO {name} {metric}: {base:.1f} -> {cur:.1f}")
+        if regressions:
+            return 1
+        print("sem regressões")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Cache de respostas com chave normalizada e despejo LRU.
+
+Mensagens equivalentes ("O que é Docker?", "o que e docker") compartilham a
+mesma entrada do cache: a chave ignora maiúsculas, acentos, pontuação e
+espaços repetidos.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+_PUNCT_RE = re.compile(r"[^\w\s+-]+")
+_NON_ASCII_RE = re.compile("[^\x00-\x7f]+")
+# Mesma troca de _PUNCT_RE, em tabela, para texto ASCII (o caso comum, bem mais rápido).
+_ASCII_PUNCT = {c: " " for c in range(128) if _PUNCT_RE.match(chr(c))}
+
+
+def _fold(match):
+    # Só os trechos não ASCII passam pela decomposição; o resto do texto já está na forma final.
+    run = unicodedata.normalize("NFKD", match.group())
+    run = "".join(ch for ch in run if not unicodedata.combining(ch))
+    return _PUNCT_RE.sub(" ", run)
+
+
+def normalize(message):
+    """Forma canônica de uma mensagem: minúsculas, sem acentos nem pontuação."""
+    text = (message or "").lower()
+    if not text.isascii():
+        text = _NON_ASCII_RE.sub(_fold, text)
+        if not text.isascii():
+            return " ".join(_PUNCT_RE.sub(" ", text).split())
+    return " ".join(text.translate(_ASCII_PUNCT).split())
+
+
+class ResponseCache:
+    """Cache LRU limitado a `maxsize` entradas, com expiração opcional (`ttl`, em segundos).
+
+    Mantém contadores de acertos, faltas e despejos em `stats()`. É seguro para
+    uso a partir de várias threads.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stamp = entry
+                if self.ttl is None or time.monotonic() - stamp < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -1,224 +1,463 @@
 """Módulo com lógica de respostas simuladas focadas em assuntos de TI.
-Função pública: get_response(message: str) -> str
+Funções públicas:
+- get_response(message: str) -> str
+- cached_response(message: str) -> str  (memoizado; ver cache_stats())
+- iter_response(message: str) -> Iterator[str]  (resposta em trechos)
+- get_responses(messages, workers=None, chunksize=64, seed=None) -> list[str]
+- search(message: str, k: int) -> list
+- knowledge() / reload_kb(path=None)  (base de conhecimento em uso / recarga sem parar)
+- enable_instrumentation() / disable_instrumentation()  (tempos por etapa e ramo)
+
+Também pode ser usado pela linha de comando, sem interface gráfica:
+`python -m chatbot --jsonl < perguntas.jsonl > respostas.jsonl`
 """
+import json
+import os
+import sys
+import threading
 import time
-import random
 import re
-from difflib import get_close_matches
-
-
-_KB = {
-    "python": (
-        "Parece que você está falando de Python. Dicas rápidas:\n"
-        "- Instalar pacotes: `pip install <pacote>`\n"
-        "- Ambientes virtuais: `python -m venv venv` e `venv\\Scripts\\activate` (Windows) / `source venv/bin/activate` (Linux)\n"
-        "- Frameworks: use `django` para aplicações completas, `flask` para microserviços.\n"
-        "Se tiver um erro, cole o traceback que eu ajudo a interpretar."
-    ),
-    "git": (
-        "Git — comandos essenciais:\n"
-        "- `git status` : ver mudanças\n"
-        "- `git add .` e `git commit -m 'mensagem'` : salvar alterações\n"
-        "- `git push` e `git pull` : sincronizar com remoto\n"
-        "Se tiver conflito, leia o arquivo marcado e resolva, depois `git add` + `git commit`."
-    ),
-    "linux": (
-        "Linux / terminal — dicas:\n"
-        "- Navegação: `ls`, `cd`, `pwd`\n"
-        "- Procurar: `grep -R 'texto' .`\n"
-        "- Pacotes (Debian/Ubuntu): `sudo apt update && sudo apt install <pacote>`\n"
-        "Se precisar de um comando específico, diga o que quer fazer."
-    ),
-    "network": (
-        "Rede — diagnóstico básico:\n"
-        "- Windows: `ipconfig /all` ; Linux: `ip addr`\n"
-        "- Teste de latência: `ping <host>`\n"
-        "- DNS: `nslookup <host>` ou `dig <host>`\n"
-        "Forneça saídas de `ping`/`ipconfig` se quiser uma análise."
-    ),
-    "docker": (
-        "Docker básico:\n"
-        "- `docker build -t minha-app .`\n"
-        "- `docker run -p 80:80 minha-app`\n"
-        "- Para ver containers: `docker ps -a`\n"
-        "Se quiser um Dockerfile de exemplo, diga qual tecnologia (Python, Node, etc.)."
-    ),
-    "debug": (
-        "Debugging:\n"
-        "- Isole o menor caso reproduzível\n"
-        "- Leia o traceback (o primeiro erro útil geralmente aparece no final)\n"
-        "- Use prints/logging ou um depurador (pdb para Python)\n"
-    ),
-}
-
-
-_DEFS = {
-    "hardware": "Hardware são os componentes físicos de um computador ou dispositivo, como CPU, memória RAM, disco rígido, placa-mãe, etc.",
-    "software": "Software são os programas, sistemas e aplicativos que rodam em um computador, incluindo sistema operacional e aplicações.",
-    "ram": "RAM (Random Access Memory) é a memória principal do computador, usada para armazenar dados temporários durante a execução de programas.",
-    "cpu": "CPU (Unidade Central de Processamento) é o 'cérebro' do computador, responsável por executar instruções e cálculos.",
-    "gpu": "GPU (Unidade de Processamento Gráfico) é um processador especializado em renderizar gráficos e fazer cálculos paralelos.",
-    "ssd": "SSD (Solid State Drive) é um tipo de armazenamento mais rápido que HD tradicional, sem partes móveis.",
-    "rede": "Rede de computadores é um conjunto de dispositivos conectados que podem trocar dados entre si, como a Internet.",
-    "internet": "Internet é uma rede global de computadores interconectados usando protocolos padrão como TCP/IP.",
-    "wifi": "Wi-Fi é uma tecnologia de rede sem fio que permite conectar dispositivos à Internet usando ondas de rádio.",
-    "bluetooth": "Bluetooth é uma tecnologia de comunicação sem fio para troca de dados entre dispositivos próximos.",
-    "linux": "Linux é um kernel de sistema operacional livre usado em muitas distribuições como Ubuntu, Red Hat e Android.",
-    "windows": "Windows é um sistema operacional da Microsoft, conhecido por sua interface gráfica e compatibilidade com softwares.",
-    "mac": "macOS é o sistema operacional da Apple para computadores Mac, conhecido por design e integração com iOS.",
-    "android": "Android é um sistema operacional móvel baseado em Linux, usado na maioria dos smartphones.",
-    "ios": "iOS é o sistema operacional móvel da Apple, usado em iPhones e iPads.",
-    "git": "Git é um sistema de controle de versão que permite rastrear mudanças em código e colaborar em projetos.",
-    "github": "GitHub é uma plataforma de hospedagem de código que usa Git, permitindo colaboração em projetos de software.",
-    "api": "API (Interface de Programação de Aplicações) é um conjunto de regras que permite diferentes softwares se comunicarem.",
-    "rest": "REST é um estilo de arquitetura para APIs web que usa HTTP para comunicação entre sistemas.",
-    "http": "HTTP é o protocolo usado para transferir dados na web, como quando você acessa um site.",
-    "https": "HTTPS é a versão segura do HTTP, que criptografa dados entre seu navegador e o site.",
-    "dns": "DNS converte nomes de domínio (como google.com) em endereços IP que computadores usam para se comunicar.",
-    "ip": "IP (Protocolo de Internet) é o endereço único que identifica dispositivos em uma rede.",
-    "servidor": "Servidor é um computador ou sistema que fornece recursos, dados ou serviços para outros computadores na rede.",
-    "cliente": "Cliente é um programa ou dispositivo que acessa recursos ou serviços fornecidos por um servidor.",
-    "database": "Banco de Dados é um sistema organizado para armazenar, gerenciar e recuperar informações.",
-    "sql": "SQL é a linguagem padrão para manipular bancos de dados relacionais, usada para consultas e atualizações.",
-    "nosql": "NoSQL são bancos de dados não relacionais, flexíveis para dados não estruturados como MongoDB e Redis.",
-    "frontend": "Frontend é a parte visual de um software ou site, com a qual os usuários interagem diretamente.",
-    "backend": "Backend é a parte do sistema que processa dados nos servidores, invisível aos usuários.",
-    "fullstack": "Full Stack é o desenvolvimento que abrange tanto frontend quanto backend de aplicações.",
-    "bug": "Bug é um erro ou falha em um programa que faz ele funcionar incorretamente ou travar.",
-    "debug": "Debug é o processo de encontrar e corrigir bugs (erros) em um programa.",
-    "algoritmo": "Algoritmo é uma sequência de passos lógicos para resolver um problema ou realizar uma tarefa.",
-    "codigo": "Código ou código-fonte são as instruções escritas em linguagem de programação para criar programas.",
-    "compilador": "Compilador traduz código escrito em linguagem de programação para linguagem de máquina executável.",
-    "ide": "IDE (Ambiente de Desenvolvimento) é um software que ajuda a escrever e testar código, como VS Code.",
-    "javascript": "JavaScript é uma linguagem de programação principalmente usada para criar sites interativos.",
-    "python": "Python é uma linguagem de programação popular, fácil de aprender e versátil.",
-    "java": "Java é uma linguagem de programação versátil usada em Android, servidores e aplicações empresariais.",
-    "docker": "Docker permite empacotar aplicações e dependências em containers para fácil distribuição.",
-    "container": "Container é um pacote de software que inclui tudo necessário para executar uma aplicação.",
-    "cloud": "Cloud Computing é o fornecimento de serviços de computação pela Internet (servidores, armazenamento, etc).",
-    "aws": "AWS (Amazon Web Services) é uma plataforma de serviços em nuvem líder no mercado.",
-    "devops": "DevOps é uma cultura que une desenvolvimento de software com operações de TI.",
-    "agile": "Agile é uma abordagem de desenvolvimento de software que prioriza entregas incrementais e adaptação.",
-    "scrum": "Scrum é um framework ágil para gerenciar projetos complexos, comum em desenvolvimento de software.",
-    "seguranca": "Segurança em TI envolve proteger sistemas, redes e dados contra ameaças e acessos não autorizados.",
-    "firewall": "Firewall é uma barreira de segurança que controla o tráfego de rede, bloqueando acessos suspeitos.",
-    "backup": "Backup é uma cópia de segurança de dados para prevenir perdas em caso de falhas.",
-    "virus": "Vírus é um programa malicioso que pode danificar sistemas e roubar dados.",
-    "criptografia": "Criptografia é a técnica de proteger informações convertendo-as em código secreto.",
-    "blockchain": "Blockchain é uma tecnologia de registro distribuído, base de criptomoedas como Bitcoin.",
-    "programacao": "Programação é a arte de criar instruções para computadores executarem tarefas.",
-    "programar": "Programar é criar instruções (código) para fazer computadores realizarem tarefas.",
-    "computador": "Computador é uma máquina eletrônica que processa dados seguindo instruções programadas.",
-    "tecnologia": "Tecnologia da Informação (TI) é a área que lida com computadores, redes e processamento de dados.",
-    "desenvolvedor": "Desenvolvedor ou programador é um profissional que cria software e aplicações.",
-    "programador": "Programador é quem escreve código para criar programas de computador.",
-    "computacao": "Computação é a ciência que estuda processamento de informações usando computadores.",
-    "informatica": "Informática é o estudo e uso de computadores e tecnologias digitais.",
-    "linguagem": "Linguagem de programação é um conjunto de regras para escrever instruções que o computador entende.",
-    "html": "HTML é a linguagem de marcação usada para estruturar conteúdo em páginas web.",
-    "css": "CSS é a linguagem de estilos usada para definir a aparência (layout, cores, fontes) de páginas web."
-}
-
-
-_DEFS.update({
-    "javascript": "JavaScript é uma linguagem de programação que roda principalmente em navegadores e também no servidor (Node.js); é usada para tornar páginas web interativas.",
-    "js": "JavaScript (JS) é a linguagem usada para programação web no cliente e também no servidor via Node.js.",
-    "html": "HTML é a linguagem de marcação usada para estruturar conteúdo em páginas web.",
-    "css": "CSS é a linguagem de estilos usada para definir a aparência (layout, cores, fontes) de páginas web.",
-    "sql": "SQL é uma linguagem para consultar e manipular bancos de dados relacionais (ex: SELECT, INSERT, UPDATE).",
-    "database": "Database (banco de dados) é um local estruturado para armazenar e consultar dados; pode ser relacional (Postgres, MySQL) ou NoSQL (MongoDB).",
-    "node": "Node.js é um ambiente de execução JavaScript para construir aplicações de servidor e ferramentas de linha de comando.",
-    "nodejs": "Node.js permite executar JavaScript fora do navegador, muito usado em backends e ferramentas de desenvolvimento.",
-})
-
-def _find_best_topic(tokens):
+from itertools import islice
+
+from cache import ResponseCache, normalize
+from fuzzy import FuzzyIndex
+from kb import open_kb
+from metrics import NULL_TRACE, Registry, Trace
+from retrieval import RetrievalIndex
+
+
+# A base de conhecimento fica em knowledge.json (compilada para knowledge.kb);
+# CHATTI_KB aponta para outro arquivo .json ou .kb.
+KB_PATH = os.environ.get("CHATTI_KB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge.json"))
+
+# Recuperação ranqueada usada como último recurso antes da resposta genérica.
+# Desligada por padrão para manter as respostas atuais; ative com RETRIEVAL_FALLBACK = True.
+RETRIEVAL_FALLBACK = False
+RETRIEVAL_MIN_SCORE = 0.25
+
+CACHE_SIZE = 1024
+
+
+class Knowledge:
+    """Versão imutável da base carregada: seções kb/defs e seus índices.
+
+    Cada chamada de get_response usa uma única instância do começo ao fim, então
+    `reload_kb` pode publicar uma nova versão sem afetar as requisições em curso.
+    O cache de respostas pertence à versão: uma resposta calculada com a base
+    anterior nunca é guardada no cache da nova.
+    """
+
+    def __init__(self, path):
+        base = open_kb(path)
+        self.path = path
+        self.kb = base.kb
+        self.defs = base.defs
+        self.kb_index = FuzzyIndex(self.kb.keys())
+        self.defs_index = FuzzyIndex(self.defs.keys())
+        self.cache = ResponseCache(maxsize=CACHE_SIZE)
+        self._retrieval = None
+
+    @property
+    def retrieval(self):
+        # Montado só no primeiro uso: indexar exige decodificar todas as respostas.
+        if self._retrieval is None:
+            self._retrieval = RetrievalIndex.from_kb(self.kb, self.defs)
+        return self._retrieval
+
+
+# Carregada no primeiro uso (não na importação), para não atrasar quem só importa o módulo.
+_KNOWLEDGE = None
+_KNOWLEDGE_LOCK = threading.Lock()
+
+
+def knowledge() -> Knowledge:
+    """Versão da base de conhecimento em uso (carregada na primeira chamada)."""
+    global _KNOWLEDGE
+    if _KNOWLEDGE is None:
+        with _KNOWLEDGE_LOCK:
+            if _KNOWLEDGE is None:
+                _KNOWLEDGE = Knowledge(KB_PATH)
+    return _KNOWLEDGE
+
+
+def warm_up() -> Knowledge:
+    """Carrega a base e monta os índices aproximados antes da primeira mensagem."""
+    know = knowledge()
+    know.kb_index.prepare()
+    know.defs_index.prepare()
+    return know
+
+
+def reload_kb(path=None) -> Knowledge:
+    """Carrega a base (de `path` ou da atual) e a publica atomicamente.
+
+    A nova versão é montada por completo antes da troca, que é uma única
+    atribuição; as requisições em andamento terminam com a versão anterior.
+    """
+    global _KNOWLEDGE
+    fresh = Knowledge(path or (_KNOWLEDGE.path if _KNOWLEDGE is not None else KB_PATH))
+    fresh.kb_index.prepare()
+    fresh.defs_index.prepare()
+    _KNOWLEDGE = fresh
+    return fresh
+
+
+def search(message, k=5):
+    """Retorna as `k` entradas da base mais parecidas com a mensagem, com pontuação."""
+    return knowledge().retrieval.search(message or "", k=k)
+
+
+_GENERIC = (
+    "Explique em mais detalhes: qual sistema operacional, linguagem e o que você já tentou?",
+    "Dê um exemplo do comando/erro que você está vendo, assim eu posso sugerir uma correção precisa.",
+    "Posso ajudar com comandos passo a passo, exemplos de código ou diagnósticos — qual você prefere?",
+)
+
+_TOKEN_RE = re.compile(r"[a-zA-Z0-9_+-]+")
+_DEF_KEY_RE = re.compile(r"(?:o que|oque)\s+(?:e|é)\s+(?:o|a|um|uma)?\s*([a-zA-Z0-9_+\-]+)")
+
+# Tabela de intenções por ordem de prioridade. Todas são compiladas em uma única
+# alternância dentro de um lookahead, para que uma só varredura do texto encontre
+# as ocorrências de todas (inclusive sobrepostas), com a mesma semântica de
+# substring das verificações `in`/`re.search` originais.
+_INTENT_PATTERNS = (
+    ("error", r"traceback|exception|erro|error"),
+    ("howto", r"como (?:instalar|faco|usar)"),
+    ("definition", r"o que e|oque e|definicao|significa"),
+    ("network", r"ping|ipconfig|nslookup|dig|tracert|traceroute"),
+)
+_INTENT_RE = re.compile(
+    "(?=" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in _INTENT_PATTERNS) + ")"
+)
+
+
+def _scan_intents(low):
+    """Retorna o conjunto de intenções presentes no texto em uma única passada.
+
+    A varredura para no primeiro sinal de erro, que tem prioridade sobre as demais.
+    """
+    found = set()
+    for m in _INTENT_RE.finditer(low):
+        kind = m.lastgroup
+        if kind == "error":
+            return {"error"}
+        found.add(kind)
+    return found
+
+
+def _find_best_topic(tokens, know):
     
     for t in tokens:
-        if t in _KB:
+        if t in know.kb:
             return t
 
     
     joined = " ".join(tokens)
-    choices = list(_KB.keys())
-    close = get_close_matches(joined, choices, n=1, cutoff=0.6)
+    close = know.kb_index.best(joined, cutoff=0.6)
     if close:
-        return close[0]
+        return close
 
     
     for t in tokens:
-        close = get_close_matches(t, choices, n=1, cutoff=0.7)
+        close = know.kb_index.best(t, cutoff=0.7)
         if close:
-            return close[0]
+            return close
 
     return None
 
 
-def get_response(message: str) -> str:
+def get_response(message: str, rng=None) -> str:
     """Gera uma resposta mais robusta sobre tópicos de TI usando regras e correspondência aproximada.
 
     Regras:
     - Tokeniza a mensagem
-    - Tenta mapear para um tópico conhecido em _KB
+    - Tenta mapear para um tópico conhecido na base (seção kb)
     - Se não encontrar, busca por padrões (ex.: erros, comandos, perguntas abertas)
     - Caso indefinido, pede clarificação
+
+    `rng` (opcional) é um `random.Random` usado na escolha da resposta genérica,
+    permitindo resultados reproduzíveis.
     """
-    msg = (message or "").strip()
-    if not msg:
-        return "Não recebi uma pergunta — diga algo sobre TI ou descreva o problema que você tem."
+    return _respond_with(knowledge(), message, rng)
+
+
+def _respond_with(know, message, rng=None):
+    if _INSTRUMENT is None:
+        return _answer(know, message, rng, NULL_TRACE)[1]
+    return _INSTRUMENT.run(_answer, know, message, rng)
 
-    low = msg.lower()
-    
-    tokens = re.findall(r"[a-zA-Z0-9_+-]+", low)
+
+def _answer(know, message, rng, trace):
+    """Núcleo de get_response sobre a versão `know`: retorna (ramo, resposta), marcando as etapas em `trace`."""
+    # O motor só enxerga a forma normalizada (sem acentos, maiúsculas nem pontuação),
+    # a mesma usada como chave do cache: mensagens equivalentes têm a mesma resposta.
+    low = normalize(message)
+    if not low:
+        return "empty", "Não recebi uma pergunta — diga algo sobre TI ou descreva o problema que você tem."
+
+    trace.lap("normalize")
+    intents = _scan_intents(low)
+    trace.lap("intents")
 
     
-    if "traceback" in low or "exception" in low or "erro" in low or "error" in low:
-        return (
+    if "error" in intents:
+        return "error", (
             "Parece um problema de execução. Cole aqui o traceback ou descreva o erro completo.\n"
             "Enquanto isso, verifique a linha apontada no traceback e as importações/versões dos pacotes."
         )
 
+    tokens = _TOKEN_RE.findall(low)
+    trace.lap("tokenize")
 
-    if re.search(r"como (instalar|faço|faco|usar)", low):
+    if "howto" in intents:
         
-        topic = _find_best_topic(tokens)
-        if topic and topic in _KB:
-            return _KB[topic]
-        return "Você quer instruções de instalação para qual tecnologia? (ex: Python, Docker, Node)"
+        topic = _find_best_topic(tokens, know)
+        trace.lap("topic")
+        if topic and topic in know.kb:
+            return "howto", know.kb[topic]
+        return "howto_miss", "Você quer instruções de instalação para qual tecnologia? (ex: Python, Docker, Node)"
 
-    if re.search(r"o que é|oque é|o que e|definição|significa", low):
+    if "definition" in intents:
         
-        m = re.search(r"(?:o que|oque)\s+(?:e|é)\s+(?:o|a|um|uma)?\s*([a-zA-Z0-9_+\-]+)", low)
+        m = _DEF_KEY_RE.search(low)
         if m:
             key = m.group(1).strip().lower()
             
             key = re.sub(r"[^a-z0-9]", "", key)
           
-            if key in _DEFS:
-                return _DEFS[key]
-            close = get_close_matches(key, list(_DEFS.keys()), n=1, cutoff=0.7)
+            if key in know.defs:
+                trace.lap("defs")
+                return "definition", know.defs[key]
+            close = know.defs_index.best(key, cutoff=0.7)
+            trace.lap("defs")
             if close:
-                return _DEFS[close[0]]
+                return "definition_fuzzy", know.defs[close]
           
-            topic = _find_best_topic(tokens)
-            if topic and topic in _KB:
-                return _KB[topic].split("\n")[0]
-        return "Sobre qual conceito você quer a definição? (ex: Docker, Kubernetes, Git, VM, container, JavaScript)"
+            topic = _find_best_topic(tokens, know)
+            trace.lap("topic")
+            if topic and topic in know.kb:
+                return "definition_topic", know.kb[topic].split("\n")[0]
+        return "definition_miss", "Sobre qual conceito você quer a definição? (ex: Docker, Kubernetes, Git, VM, container, JavaScript)"
 
-    topic = _find_best_topic(tokens)
+    topic = _find_best_topic(tokens, know)
+    trace.lap("topic")
     if topic:
-        return _KB[topic]
+        return "topic", know.kb[topic]
 
-    if any(k in low for k in ("ping", "ipconfig", "nslookup", "dig", "tracert", "traceroute")):
-        return (
+    if "network" in intents:
+        return "network", (
             "Para diagnóstico de rede, rode o comando apropriado e cole a saída aqui. Exemplos:\n"
             "- Windows: `ipconfig /all`\n"
             "- Ping: `ping 8.8.8.8`\n"
             "- DNS: `nslookup exemplo.com`\n"
         )
 
-    generic = [
-        "Explique em mais detalhes: qual sistema operacional, linguagem e o que você já tentou?",
-        "Dê um exemplo do comando/erro que você está vendo, assim eu posso sugerir uma correção precisa.",
-        "Posso ajudar com comandos passo a passo, exemplos de código ou diagnósticos — qual você prefere?",
-    ]
-    return random.choice(generic)
+    if RETRIEVAL_FALLBACK:
+        hits = know.retrieval.search(low, k=1, min_score=RETRIEVAL_MIN_SCORE)
+        trace.lap("retrieval")
+        if hits:
+            return "retrieval", hits[0].answer
+
+    if rng is None:
+        import random
+        rng = random
+    return "generic", rng.choice(_GENERIC)
+
+
+class _Instrumentation:
+    def __init__(self, registry, callback):
+        self.registry = registry
+        self.callback = callback
+
+    def run(self, answer, know, message, rng):
+        trace = Trace()
+        branch, resp = answer(know, message, rng, trace)
+        total = trace.elapsed()
+        registry = self.registry
+        registry.incr(f"branch.{branch}")
+        registry.observe(f"branch.{branch}", total)
+        registry.observe("total", total)
+        for stage, seconds in trace.stages.items():
+            registry.observe(f"stage.{stage}", seconds)
+        if self.callback:
+            self.callback({"branch": branch, "total": total, "stages": trace.stages})
+        return resp
+
+
+_INSTRUMENT = None
+
+
+def enable_instrumentation(registry=None, callback=None):
+    """Liga a medição por etapa em get_response e retorna o `metrics.Registry` usado.
+
+    Cada chamada registra o ramo que respondeu (contador `branch.<ramo>` e
+    histograma de tempo total) e o tempo de cada etapa (`stage.<etapa>`:
+    normalize, intents, tokenize, defs, topic, retrieval). `callback`, se
+    informado, recebe um dicionário por chamada. Desligada, o custo é o de
+    algumas chamadas vazias.
+    """
+    global _INSTRUMENT
+    _INSTRUMENT = _Instrumentation(registry or Registry(), callback)
+    return _INSTRUMENT.registry
+
+
+def disable_instrumentation():
+    global _INSTRUMENT
+    _INSTRUMENT = None
+
+
+def cached_response(message: str, cache_generic=False) -> str:
+    """Como get_response, mas memoizado pela forma normalizada da mensagem.
+
+    Mensagens equivalentes recebem a resposta calculada para a primeira delas.
+    As respostas genéricas (aleatórias) não são guardadas, a menos que
+    `cache_generic=True`.
+    """
+    know = knowledge()
+    key = normalize(message)
+    resp = know.cache.get(key)
+    if resp is not None:
+        return resp
+    resp = _respond_with(know, message)
+    if cache_generic or resp not in _GENERIC:
+        know.cache.put(key, resp)
+    return resp
+
+
+_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+
+def iter_response(message: str):
+    """Variante em streaming de cached_response: produz a resposta em trechos (palavras).
+
+    Um backend real pode substituir esta função por uma que produza trechos à
+    medida que são gerados; quem consome só precisa concatenar os trechos.
+    """
+    for m in _CHUNK_RE.finditer(cached_response(message)):
+        yield m.group(0)
+
+
+def cache_stats() -> dict:
+    """Contadores do cache de respostas (acertos, faltas, despejos, tamanho)."""
+    return knowledge().cache.stats()
+
+
+def _respond(item):
+    index, message, seed = item
+    import random
+    rng = random.Random(f"{seed}:{index}") if seed is not None else None
+    return get_response(message, rng=rng)
+
+
+def get_responses(messages, workers=None, chunksize=64, seed=None):
+    """Responde uma sequência de mensagens em lote, preservando a ordem de entrada.
+
+    O trabalho é distribuído em um pool de processos (`workers`, padrão: número de
+    CPUs); cada processo carrega a base e os índices uma única vez, na primeira
+    mensagem. Com `seed` definido, a resposta genérica de cada mensagem depende só de (seed, posição), então o resultado é reproduzível
+    independentemente de `workers` e `chunksize`. `workers=1` roda no processo atual.
+    """
+    items = [(i, m, seed) for i, m in enumerate(messages)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(items) <= chunksize:
+        return [_respond(item) for item in items]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_respond, items, chunksize=chunksize))
+
+
+def _parse_line(line, jsonl, field):
+    """Retorna (ok, registro); com ok False o registro é só o erro a escrever na saída.
+
+    A validade vem separada porque um objeto válido pode ter o próprio campo "error".
+    """
+    if not jsonl:
+        return True, {field: line.rstrip("\n")}
+    try:
+        obj = json.loads(line)
+    except ValueError as exc:
+        return False, {"error": f"JSON inválido: {exc}"}
+    if isinstance(obj, str):
+        return True, {field: obj}
+    if not isinstance(obj, dict):
+        return False, {"error": "cada linha deve ser um objeto JSON ou uma string"}
+    return True, obj
+
+
+def _batches(lines, size):
+    lines = (line for line in lines if line.strip())
+    while True:
+        batch = list(islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_stream(infile, outfile, jsonl=True, field="message", batch_size=256, workers=1, seed=None):
+    """Lê mensagens de `infile` e escreve uma resposta JSON por linha em `outfile`.
+
+    A entrada é consumida em lotes de `batch_size` linhas, então o uso de memória
+    não depende do tamanho da entrada; a saída é descarregada a cada lote. Com
+    `workers > 1`, cada lote é dividido entre processos, mantendo a ordem.
+    """
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+    index = 0
+    try:
+        for batch in _batches(infile, batch_size):
+            records = [_parse_line(line, jsonl, field) for line in batch]
+            items = []
+            for ok, rec in records:
+                if ok:
+                    items.append((index, str(rec.get(field) or ""), seed))
+                index += 1
+            if pool:
+                chunk = max(1, len(items) // (workers * 4))
+                answers = iter(pool.map(_respond, items, chunksize=chunk))
+            else:
+                answers = map(_respond, items)
+            for ok, rec in records:
+                if ok:
+                    rec["response"] = next(answers)
+                outfile.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            outfile.flush()
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Responde mensagens em lote (uma por linha) sem interface gráfica.")
+    parser.add_argument("input", nargs="?", default="-", help="arquivo de entrada (padrão: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--jsonl", action="store_true", help="entrada em JSON por linha (objeto ou string)")
+    parser.add_argument("--field", default="message", help="campo com a mensagem em cada objeto JSON")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", default=None, help="torna as respostas genéricas reproduzíveis")
+    parser.add_argument("--metrics", default=None,
+                        help="grava tempos por etapa/ramo em JSON neste arquivo (só com --workers 1)")
+    args = parser.parse_args(argv)
+
+    registry = enable_instrumentation() if args.metrics else None
+
+    infile = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run_stream(infile, outfile, jsonl=args.jsonl, field=args.field,
+                   batch_size=args.batch_size, workers=args.workers, seed=args.seed)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+        if registry is not None:
+            registry.dump_json(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""Lista de mensagens virtualizada para a janela de chat.
+
+As mensagens ficam em um modelo de dados simples (`Message`); só existem
+widgets para uma janela de `window` mensagens ao redor da posição atual. Os
+balões (`BubbleView`) que saem da janela são reaproveitados para as mensagens
+que entram, então anexar e rolar custam o mesmo em qualquer tamanho de histórico.
+"""
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+
+class Message:
+    __slots__ = ("role", "name", "text", "ts")
+
+    def __init__(self, role, name, text, ts=None):
+        self.role = role
+        self.name = name
+        self.text = text
+        self.ts = ts or time.strftime("%H:%M")
+
+    @property
+    def is_user(self):
+        return self.role == "user"
+
+
+class Palette:
+    """Registro central de cores do chat.
+
+    As cores dos balões ficam em estilos ttk nomeados por papel do remetente
+    ("User.Bubble.TLabel", "Bot.Bubble.TFrame", ...); trocar o tema só
+    reconfigura esses estilos, e o Tk repinta os widgets que os usam. O que
+    não é ttk (canvas, imagens) assina o registro com `subscribe` e recebe as novas cores.
+    """
+
+    def __init__(self, themes, name):
+        self.themes = themes
+        self.name = name
+        self.style = ttk.Style()
+        self._subscribers = []
+
+    @property
+    def colors(self):
+        return self.themes[self.name]
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def apply(self, name=None):
+        if name is not None:
+            self.name = name
+        colors = self.colors
+        self.style.configure("Chat.TFrame", background=colors["bg"])
+        self.style.configure("Avatar.TLabel", background=colors["bg"], foreground=colors["fg"], padding=0)
+        for role, key in (("User", "user_bg"), ("Bot", "bot_bg")):
+            self.style.configure(f"{role}.Bubble.TFrame", background=colors[key])
+            self.style.configure(f"{role}.Bubble.TLabel", background=colors[key], foreground=colors["fg"])
+        self.style.configure("Match.Bubble.TLabel", background=colors["match_bg"], foreground=colors["fg"])
+        for callback in self._subscribers:
+            callback(colors)
+
+
+def _style_role(message):
+    return "User" if message.is_user else "Bot"
+
+
+class AvatarCache:
+    """Imagens de avatar (círculo na cor do remetente) compartilhadas por todos os balões.
+
+    Há uma única `PhotoImage` exibida por remetente ("user"/"bot"), usada como
+    imagem dos rótulos de avatar, com a inicial por cima como texto. A versão de
+    cada (remetente, tema) é desenhada uma vez e guardada; trocar o tema só copia
+    a versão do novo tema para a imagem exibida, e o Tk repinta os balões que a usam.
+    """
+
+    def __init__(self, palette, size=40):
+        self.palette = palette
+        self.size = size
+        self._master = palette.style.master
+        self._rendered = {}
+        self._shown = {}
+        palette.subscribe(self._on_theme)
+
+    def image(self, role):
+        shown = self._shown.get(role)
+        if shown is None:
+            shown = tk.PhotoImage(master=self._master, width=self.size, height=self.size)
+            self._copy(self._render(role, self.palette.name), shown)
+            self._shown[role] = shown
+        return shown
+
+    def _render(self, role, theme):
+        key = (role, theme)
+        img = self._rendered.get(key)
+        if img is None:
+            colors = self.palette.themes[theme]
+            fill = colors["user_bg"] if role == "user" else colors["bot_bg"]
+            img = tk.PhotoImage(master=self._master, width=self.size, height=self.size)
+            # Círculo preenchido linha a linha; o resto da imagem fica transparente.
+            center = self.size / 2.0
+            radius = center - 4
+            for y in range(self.size):
+                dy = y + 0.5 - center
+                if abs(dy) > radius:
+                    continue
+                dx = (radius * radius - dy * dy) ** 0.5
+                img.put(fill, to=(int(center - dx + 0.5), y, int(center + dx + 0.5), y + 1))
+            self._rendered[key] = img
+        return img
+
+    @staticmethod
+    def _copy(src, dst):
+        dst.tk.call(dst, "copy", src, "-compositingrule", "set")
+
+    def _on_theme(self, colors):
+        for role, shown in self._shown.items():
+            self._copy(self._render(role, self.palette.name), shown)
+
+
+class BubbleView:
+    """Conjunto reutilizável de widgets que desenha uma mensagem."""
+
+    def __init__(self, parent, avatars, fonts):
+        self.frame = ttk.Frame(parent, style="Chat.TFrame")
+        self.avatars = avatars
+        self.avatar = ttk.Label(self.frame, style="Avatar.TLabel", compound="center", font=fonts["name"])
+        self.bubble = ttk.Frame(self.frame)
+        self.name_lbl = ttk.Label(self.bubble, font=fonts["name"])
+        self.name_lbl.pack(anchor="w", padx=6, pady=(6, 0))
+        self.text_lbl = ttk.Label(self.bubble, wraplength=520, justify="left", font=fonts["msg"], padding=(6, 4))
+        self.text_lbl.pack(anchor="w", padx=6)
+        self.time_lbl = ttk.Label(self.bubble, font=fonts["time"])
+        self.time_lbl.pack(anchor="e", padx=6, pady=(0, 6))
+        self.message = None
+        self._role = None
+        self._text_style = None
+
+    def bind(self, message, highlight=False):
+        self.message = message
+        if message.role != self._role:
+            side = "right" if message.is_user else "left"
+            role = _style_role(message)
+            self.avatar.pack_forget()
+            self.bubble.pack_forget()
+            self.avatar.pack(side=side, padx=6)
+            self.bubble.pack(side=side, padx=(0, 10) if message.is_user else (10, 0))
+            self.bubble.configure(style=f"{role}.Bubble.TFrame")
+            for lbl in (self.name_lbl, self.time_lbl):
+                lbl.configure(style=f"{role}.Bubble.TLabel")
+            self.avatar.configure(image=self.avatars.image(message.role))
+            self._role = message.role
+        text_style = "Match.Bubble.TLabel" if highlight else f"{_style_role(message)}.Bubble.TLabel"
+        if text_style != self._text_style:
+            self.text_lbl.configure(style=text_style)
+            self._text_style = text_style
+        initial = (message.name[0] if message.name else "?").upper()
+        self.avatar.configure(text=initial)
+        self.name_lbl.configure(text=message.name)
+        self.text_lbl.configure(text=message.text)
+        self.time_lbl.configure(text=message.ts)
+
+
+class RenderScheduler:
+    """Agrupa alterações de widgets e pedidos de rolagem em um único lote por quadro.
+
+    `schedule(fn, *args)` enfileira uma alteração; todas as alterações
+    enfileiradas são aplicadas juntas no próximo tique (no máximo `fps` por
+    segundo), seguidas de uma única chamada a `on_flush(scroll_end)`.
+    """
+
+    def __init__(self, widget, fps=60, on_flush=None):
+        self.widget = widget
+        self.interval = max(1, int(1000 / fps))
+        self.on_flush = on_flush
+        self._ops = []
+        self._scroll_end = False
+        self._after_id = None
+
+    def schedule(self, fn, *args):
+        self._ops.append((fn, args))
+        self._arm()
+
+    def request_scroll_end(self):
+        self._scroll_end = True
+        self._arm()
+
+    def _arm(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval, self.flush)
+
+    def flush(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        ops, self._ops = self._ops, []
+        scroll_end, self._scroll_end = self._scroll_end, False
+        for fn, args in ops:
+            fn(*args)
+        if self.on_flush:
+            self.on_flush(scroll_end)
+
+
+class MessageList:
+    """Canvas rolável que mostra uma janela deslizante de `messages`.
+
+    `views` guarda, em ordem, os balões visíveis, que mostram
+    `messages[start:start + len(views)]`. Ao chegar ao topo ou ao fim da janela
+    com a roda do mouse ou a barra de rolagem, a janela anda `page` mensagens.
+    `on_top` (opcional) é chamado quando o usuário tenta rolar acima da primeira
+    mensagem do modelo. `highlighted` é a mensagem destacada por `reveal`.
+    """
+
+    def __init__(self, parent, palette, fonts, window=40, page=10):
+        self.palette = palette
+        self.fonts = fonts
+        self.avatars = AvatarCache(palette)
+        self.window = window
+        self.page = page
+        self.on_top = None
+        self.highlighted = None
+
+        self.canvas = tk.Canvas(parent, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.inner = ttk.Frame(self.canvas, style="Chat.TFrame")
+        self.inner.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=(0, 0, e.width, e.height))
+        )
+        self.canvas.create_window((0, 0), window=self.inner, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Enter>", self._bind_wheel)
+        self.canvas.bind("<Leave>", self._unbind_wheel)
+
+        self.messages = []
+        self.start = 0
+        self.views = deque()
+        self._spare = []
+        self._tail_dirty = False
+        self._follow = True
+        self._dirty = set()
+        self.scheduler = RenderScheduler(self.canvas, on_flush=self._on_flush)
+        palette.subscribe(lambda colors: self.canvas.configure(bg=colors["bg"]))
+
+    def pack(self):
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def _take_view(self):
+        return self._spare.pop() if self._spare else BubbleView(self.inner, self.avatars, self.fonts)
+
+    def _release(self, view):
+        view.frame.pack_forget()
+        self._spare.append(view)
+
+    def _show(self, view, message, before=None):
+        view.bind(message, message is self.highlighted)
+        if before is not None:
+            view.frame.pack(fill="x", pady=6, padx=6, before=before.frame)
+        else:
+            view.frame.pack(fill="x", pady=6, padx=6)
+
+    def append(self, message):
+        """Adiciona uma mensagem ao modelo; os balões são atualizados no próximo quadro."""
+        if not self._tail_dirty:
+            self._follow = self.start + len(self.views) == len(self.messages)
+            self._tail_dirty = True
+            self.scheduler.schedule(self._sync_tail)
+        self.messages.append(message)
+        self.scheduler.request_scroll_end()
+
+    def _sync_tail(self):
+        if not self._tail_dirty:
+            return
+        self._tail_dirty = False
+        end = self.start + len(self.views)
+        new = self.messages[end:]
+        if not self._follow or len(new) >= self.window:
+            self.show_range(len(self.messages) - self.window)
+            return
+        for message in new:
+            if len(self.views) < self.window:
+                view = self._take_view()
+            else:
+                view = self.views.popleft()
+                view.frame.pack_forget()
+                self.start += 1
+            self._show(view, message)
+            self.views.append(view)
+
+    def touch(self, message):
+        """Avisa que o texto de `message` mudou; o balão é atualizado no próximo quadro."""
+        if not self._dirty:
+            self.scheduler.schedule(self._sync_dirty)
+        self._dirty.add(message)
+        if self.messages and self.messages[-1] is message:
+            self.scheduler.request_scroll_end()
+
+    def _sync_dirty(self):
+        dirty, self._dirty = self._dirty, set()
+        for view in self.views:
+            if view.message in dirty:
+                view.text_lbl.configure(text=view.message.text)
+
+    def prepend(self, messages):
+        """Insere mensagens mais antigas no início do modelo sem mover a janela visível."""
+        self.messages[0:0] = messages
+        self.start += len(messages)
+
+    def clear(self):
+        self._tail_dirty = False
+        self.highlighted = None
+        while self.views:
+            self._release(self.views.pop())
+        self.messages = []
+        self.start = 0
+
+    def show_range(self, start):
+        """Reposiciona a janela para começar em `start`, reaproveitando os balões."""
+        start = max(0, min(start, len(self.messages) - 1))
+        end = min(len(self.messages), start + self.window)
+        while len(self.views) > end - start:
+            self._release(self.views.pop())
+        while len(self.views) < end - start:
+            view = self._take_view()
+            view.frame.pack(fill="x", pady=6, padx=6)
+            self.views.append(view)
+        self.start = start
+        for view, message in zip(self.views, self.messages[start:end]):
+            view.bind(message, message is self.highlighted)
+
+    def highlight(self, message):
+        """Destaca `message` (None remove o destaque); só os balões visíveis são tocados."""
+        old, self.highlighted = self.highlighted, message
+        for view in self.views:
+            if view.message is not None and view.message in (old, message):
+                view.bind(view.message, view.message is message)
+
+    def reveal(self, index):
+        """Destaca `messages[index]` e rola até ela, movendo a janela só se estiver fora."""
+        self.scheduler.flush()
+        if not self.start <= index < self.start + len(self.views):
+            self.show_range(index - self.window // 2)
+        self.highlight(self.messages[index])
+        self.canvas.update_idletasks()
+        self._move_to(self.views[index - self.start].frame.winfo_y() - 12)
+
+    def _on_flush(self, scroll_end):
+        if scroll_end:
+            self.canvas.update_idletasks()
+            self.canvas.yview_moveto(1.0)
+
+    def _shift_up(self):
+        if self.start == 0:
+            if self.on_top:
+                self.on_top()
+            if self.start == 0:
+                return
+        old_top = self.canvas.canvasy(0)
+        added = []
+        for _ in range(min(self.page, self.start)):
+            view = self.views.pop() if len(self.views) >= self.window else self._take_view()
+            view.frame.pack_forget()
+            self.start -= 1
+            self._show(view, self.messages[self.start], before=self.views[0] if self.views else None)
+            self.views.appendleft(view)
+            added.append(view)
+        self.canvas.update_idletasks()
+        self._move_to(old_top + sum(v.frame.winfo_height() + 12 for v in added))
+
+    def _shift_down(self):
+        end = self.start + len(self.views)
+        if end >= len(self.messages):
+            return
+        old_top = self.canvas.canvasy(0)
+        removed = 0
+        for _ in range(min(self.page, len(self.messages) - end)):
+            view = self.views.popleft()
+            removed += view.frame.winfo_height() + 12
+            view.frame.pack_forget()
+            self.start += 1
+            self._show(view, self.messages[self.start + len(self.views)])
+            self.views.append(view)
+        self.canvas.update_idletasks()
+        self._move_to(old_top - removed)
+
+    def _move_to(self, top):
+        """Rola para que a coordenada `top` do conteúdo fique no alto da área visível."""
+        height = max(1, self.inner.winfo_height())
+        self.canvas.yview_moveto(max(0.0, top) / height)
+
+    def _scroll(self, direction):
+        first, last = self.canvas.yview()
+        if direction < 0 and first <= 0.0:
+            self._shift_up()
+        elif direction > 0 and last >= 1.0:
+            self._shift_down()
+        else:
+            self.canvas.yview_scroll(direction, "units")
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        first, last = self.canvas.yview()
+        if args[0] == "scroll":
+            direction = int(args[1])
+        else:
+            direction = -1 if first <= 0.0 else (1 if last >= 1.0 else 0)
+        if direction < 0 and first <= 0.0:
+            self._shift_up()
+        elif direction > 0 and last >= 1.0:
+            self._shift_down()
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            self._scroll(-1)
+        elif getattr(event, "num", None) == 5:
+            self._scroll(1)
+        elif event.delta:
+            self._scroll(-1 if event.delta > 0 else 1)
+
+    def _bind_wheel(self, _event):
+        self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+        self.canvas.bind_all("<Button-4>", self._on_wheel)
+        self.canvas.bind_all("<Button-5>", self._on_wheel)
+
+    def _unbind_wheel(self, _event):
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
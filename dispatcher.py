@@ -0,0 +1,118 @@
+"""Fila de respostas do chat: pool fixo de threads com entrega ordenada no Tk.
+
+Substitui a criação de uma thread por mensagem. As respostas são calculadas em
+um `ThreadPoolExecutor` compartilhado e entregues à thread do Tk (via
+`root.after`) exatamente na ordem em que as mensagens foram enviadas. Respostas
+em streaming são entregues trecho a trecho, também em ordem.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Histogram
+
+
+class ResponseDispatcher:
+    """Calcula `fn(text)` em segundo plano e chama `callback(resultado)` no Tk, em ordem.
+
+    - `workers`: número de threads do pool;
+    - `max_pending`: limite de mensagens aguardando resposta (`submit` recusa acima dele);
+    - `delay`: atraso mínimo simulado, em segundos, entre o envio e a entrega (0 desliga).
+
+    Com `on_chunk`, `fn(text)` deve retornar um iterável de trechos: cada trecho é
+    passado a `on_chunk` assim que chega e, ao final, `callback` recebe o texto
+    completo. Se `fn` levantar uma exceção, ela é entregue ao callback no lugar
+    do resultado.
+
+    `ttfc` registra o tempo (ms) do envio até o primeiro trecho (ou o resultado)
+    sair de `fn`, antes do atraso simulado; com `registry` (ex.: o do
+    `LagMonitor`), é o histograma `ttfc_ms` dele e aparece no painel e no log.
+    """
+
+    def __init__(self, root, fn, workers=2, max_pending=16, delay=1.2, registry=None):
+        self.root = root
+        self.fn = fn
+        self.delay = delay
+        self.max_pending = max_pending
+        self.ttfc = registry.histogram("ttfc_ms") if registry is not None else Histogram()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chatti")
+        self._generation = 0
+        self._next_seq = 0
+        self._deliver_seq = 0
+        self._jobs = {}
+        self._events = {}
+
+    @property
+    def pending(self):
+        return len(self._jobs)
+
+    def submit(self, text, callback, on_chunk=None):
+        """Enfileira uma mensagem; retorna False se a fila estiver cheia."""
+        if len(self._jobs) >= self.max_pending:
+            return False
+        seq = self._next_seq
+        self._next_seq += 1
+        sent = time.monotonic()
+        future = self._executor.submit(self._run, self._generation, seq, text, sent, on_chunk is not None)
+        self._jobs[seq] = (future, callback, on_chunk)
+        return True
+
+    def _run(self, generation, seq, text, sent, streaming):
+        if generation != self._generation:
+            return
+        due = sent + self.delay
+        try:
+            if streaming:
+                parts = []
+                for chunk in self.fn(text):
+                    if generation != self._generation:
+                        return
+                    if not parts:
+                        self._first_chunk(sent)
+                    parts.append(chunk)
+                    self._post(generation, seq, due, "chunk", chunk)
+                result = "".join(parts)
+            else:
+                result = self.fn(text)
+                self._first_chunk(sent)
+        except Exception as exc:
+            result = exc
+        self._post(generation, seq, due, "done", result)
+
+    def _first_chunk(self, sent):
+        self.ttfc.record((time.monotonic() - sent) * 1000.0)
+
+    def _post(self, generation, seq, due, kind, payload):
+        # Todo evento dispara em max(agora, due): a ordem de disparo é a ordem de envio.
+        wait_ms = max(0, int((due - time.monotonic()) * 1000))
+        self.root.after(wait_ms, self._deliver, generation, seq, kind, payload)
+
+    def _deliver(self, generation, seq, kind, payload):
+        if generation != self._generation:
+            return
+        self._events.setdefault(seq, []).append((kind, payload))
+        while self._deliver_seq in self._events:
+            head = self._deliver_seq
+            _, callback, on_chunk = self._jobs[head]
+            for kind, payload in self._events.pop(head):
+                if kind == "chunk":
+                    on_chunk(payload)
+                else:
+                    del self._jobs[head]
+                    self._deliver_seq += 1
+                    callback(payload)
+                    break
+            else:
+                return
+
+    def cancel_all(self):
+        """Descarta todas as mensagens pendentes; respostas já em cálculo são ignoradas."""
+        self._generation += 1
+        for future, *_ in self._jobs.values():
+            future.cancel()
+        self._jobs.clear()
+        self._events.clear()
+        self._deliver_seq = self._next_seq
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
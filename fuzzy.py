@@ -0,0 +1,166 @@
+"""Índice de correspondência aproximada usado pelo motor de respostas.
+
+Substitui chamadas repetidas a `difflib.get_close_matches` sobre a lista
+completa de chaves. O índice é montado uma única vez e escolhe a chave como
+`get_close_matches(palavra, chaves, n=1, cutoff=...)`, mas só compara a
+palavra com as poucas chaves que podem ser parecidas com ela.
+As listas invertidas e o `difflib` só são carregados na primeira busca.
+"""
+from functools import lru_cache
+
+
+# Tamanhos de n-grama tentados, do mais seletivo para o mais tolerante a erros.
+_QS = (3, 2)
+
+
+def _qgrams(text, q):
+    """Conjunto dos n-gramas de tamanho q, com q-1 marcas de início e de fim."""
+    padded = "\x02" * (q - 1) + text + "\x03" * (q - 1)
+    return {padded[i:i + q] for i in range(len(padded) - q + 1)}
+
+
+@lru_cache(maxsize=4096)
+def _plan(wlen, n, cutoff):
+    """Filtro para palavra de tamanho `wlen` e chave de tamanho `n`: (q, mínimo em comum).
+
+    q é o tamanho dos n-gramas, ou 0 para letras contando repetições. None se
+    nenhuma chave desse tamanho alcança o corte.
+    """
+    total = wlen + n
+    # Menor número de caracteres em comum que alcança o corte.
+    matches = next((m for m in range(1, min(wlen, n) + 1) if 2.0 * m / total >= cutoff), None)
+    if matches is None:
+        return None
+    dist = total - 2 * matches
+    removed, inserted = (dist + wlen - n) // 2, (dist - wlen + n) // 2
+    for q in _QS:
+        # N-gramas que sobram intactos, contados em cada lado.
+        need = max(
+            wlen + q - 1 - q * removed - (q - 1) * inserted,
+            n + q - 1 - q * inserted - (q - 1) * removed,
+        )
+        if need > 0:
+            return q, need
+    return 0, matches
+
+
+def _letters(text):
+    """Letras com o número da ocorrência ("ass" -> a1, s1, s2): a interseção conta repetições."""
+    seen = {}
+    out = []
+    for ch in text:
+        seen[ch] = seen.get(ch, 0) + 1
+        out.append((ch, seen[ch]))
+    return out
+
+
+class FuzzyIndex:
+    """Índices invertidos, por tamanho de chave, sobre um conjunto fixo de chaves.
+
+    O filtro não perde resultados. `ratio = 2*M/T >= corte` (M caracteres em
+    comum, T a soma dos tamanhos) limita a distância de inserções e remoções
+    entre a palavra e a chave. Cada remoção destrói no máximo q n-gramas de
+    tamanho q (com marcas de início e fim) e cada inserção, q-1; daí sai, para
+    cada tamanho de chave, quantos n-gramas ela precisa ter em comum com a
+    palavra (ver `_plan`), e pelo princípio da casa dos pombos basta unir as
+    listas mais raras deles. Tenta trigramas, depois bigramas; quando nenhum é
+    garantido (palavras curtas, muitos erros possíveis), usa as letras: a chave
+    precisa ter M letras da palavra, contando repetições.
+
+    Os candidatos são pontuados com `SequenceMatcher`, com o mesmo desempate
+    de `get_close_matches`, então o resultado é o dele (ver tests/test_fuzzy.py).
+    O custo depende de quantas chaves têm tamanho e n-gramas compatíveis com a
+    palavra: com corte 0.6 e palavras médias o filtro cai nas letras e deixa
+    passar boa parte das chaves do mesmo tamanho.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(dict.fromkeys(keys))
+        self._keyset = set(self.keys)
+        self._postings = None
+
+    def prepare(self):
+        """Monta as listas invertidas agora, em vez de na primeira busca."""
+        import difflib  # noqa: F401  (carregado junto, fora do caminho da busca)
+
+        postings = {}
+        grams = {q: [] for q in _QS + (0,)}
+        by_length = {}
+        for i, key in enumerate(self.keys):
+            n = len(key)
+            by_length.setdefault(n, []).append(i)
+            for q in _QS:
+                key_grams = _qgrams(key, q)
+                grams[q].append(key_grams)
+                for gram in key_grams:
+                    postings.setdefault((gram, n), set()).add(i)
+            key_letters = set(_letters(key))
+            grams[0].append(key_letters)
+            for letter in key_letters:
+                postings.setdefault((letter, n), set()).add(i)
+        self._grams = grams
+        self._by_length = sorted(by_length.items())
+        self._postings = postings
+        return postings
+
+    def __contains__(self, word):
+        return word in self._keyset
+
+    def __len__(self):
+        return len(self.keys)
+
+    def best(self, word, cutoff=0.6):
+        """Retorna a chave mais parecida com `word` ou None (como get_close_matches n=1)."""
+        if not word or not self.keys:
+            return None
+        if word in self._keyset:
+            # Só a própria palavra tem pontuação 1.0.
+            return word
+        from difflib import SequenceMatcher
+
+        if self._postings is None:
+            self.prepare()
+        best_score, best_key = None, None
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        for i in self._candidates(word, cutoff):
+            key = self.keys[i]
+            matcher.set_seq1(key)
+            if matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score < cutoff:
+                continue
+            # get_close_matches desempata pela maior string (heapq.nlargest sobre (score, x))
+            if best_score is None or (score, key) > (best_score, best_key):
+                best_score, best_key = score, key
+        return best_key
+
+    def _candidates(self, word, cutoff):
+        wlen = len(word)
+        queries = {}
+        postings = self._postings
+        empty = set()
+        found = set()
+        for n, bucket in self._by_length:
+            plan = _plan(wlen, n, cutoff)
+            if plan is None:
+                continue
+            q, need = plan
+            query = queries.get(q)
+            if query is None:
+                query = queries[q] = _qgrams(word, q) if q else set(_letters(word))
+            if q:
+                # Os n-gramas repetidos na palavra valem uma vez só na interseção de conjuntos.
+                need -= wlen + q - 1 - len(query)
+                if need > len(query):
+                    continue
+            key_sets = self._grams[q]
+            if len(bucket) <= len(query):
+                # Poucas chaves deste tamanho: mais barato contar em todas que unir as listas.
+                ids = bucket
+            else:
+                lists = sorted((postings.get((g, n), empty) for g in query), key=len)
+                ids = set().union(*lists[:len(lists) - need + 1])
+            found.update(i for i in ids if len(query & key_sets[i]) >= need)
+        return found
@@ -0,0 +1,133 @@
+"""Histórico persistente das conversas, por usuário, em SQLite.
+
+As gravações são somente-anexação e feitas por uma thread própria, que agrupa
+as mensagens enfileiradas em uma única transação; `append` apenas enfileira e
+retorna, sem bloquear a interface. A leitura é paginada pelo id da mensagem
+(`load_page`), para abrir o chat só com a última página e buscar as anteriores
+sob demanda.
+
+Limpar a conversa também só anexa: `clear` grava um marcador com o último id
+existente, e a leitura mostra apenas as mensagens do usuário posteriores ao
+marcador mais recente dele.
+
+Uma gravação que o SQLite recusa (ex.: "database is locked" com duas instâncias
+no mesmo arquivo) é registrada no `logging` e descartada; a thread continua.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+
+
+_log = logging.getLogger(__name__)
+
+Row = namedtuple("Row", "id role name text ts")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    ts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_user ON messages (user, id);
+CREATE TABLE IF NOT EXISTS clears (
+    user TEXT NOT NULL,
+    after_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clears_user ON clears (user, after_id);
+"""
+
+# Mensagens do usuário visíveis: as posteriores ao último "Limpar".
+_VISIBLE = "user = ? AND id > (SELECT COALESCE(MAX(after_id), 0) FROM clears WHERE user = ?)"
+
+
+class HistoryStore:
+    def __init__(self, path, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        conn.close()
+        self._reader = sqlite3.connect(path)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="chatti-history", daemon=True)
+        self._writer.start()
+
+    def append(self, user, role, name, text, ts):
+        """Enfileira uma mensagem para gravação."""
+        self._queue.put(("add", (user, role, name, text, ts)))
+
+    def clear(self, user):
+        """Oculta o histórico do usuário (na ordem das gravações já enfileiradas), sem apagá-lo."""
+        self._queue.put(("clear", (user,)))
+
+    def flush(self):
+        """Bloqueia até que tudo o que foi enfileirado esteja gravado."""
+        done = threading.Event()
+        self._queue.put(("sync", done))
+        done.wait()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        self._reader.close()
+
+    def load_page(self, user, before_id=None, limit=50):
+        """Retorna até `limit` mensagens anteriores a `before_id`, da mais antiga para a mais nova."""
+        if before_id is None:
+            cur = self._reader.execute(
+                f"SELECT id, role, name, text, ts FROM messages WHERE {_VISIBLE} ORDER BY id DESC LIMIT ?",
+                (user, user, limit),
+            )
+        else:
+            cur = self._reader.execute(
+                f"SELECT id, role, name, text, ts FROM messages WHERE {_VISIBLE} AND id < ? ORDER BY id DESC LIMIT ?",
+                (user, user, before_id, limit),
+            )
+        return [Row(*r) for r in reversed(cur.fetchall())]
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                writes = [item for item in batch if item is not None and item[0] != "sync"]
+                try:
+                    self._write(conn, writes)
+                except sqlite3.Error:
+                    # Um erro desfaz o lote inteiro: grava um a um para perder só o que falhou.
+                    for item in writes:
+                        try:
+                            self._write(conn, [item])
+                        except sqlite3.Error:
+                            _log.exception("histórico: gravação descartada (%s)", item[0])
+                finally:
+                    # Os `sync` são liberados mesmo com erro; senão `flush` bloquearia para sempre.
+                    for item in batch:
+                        if item is not None and item[0] == "sync":
+                            item[1].set()
+                if None in batch:
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write(conn, items):
+        with conn:
+            for kind, args in items:
+                if kind == "add":
+                    conn.execute("INSERT INTO messages (user, role, name, text, ts) VALUES (?, ?, ?, ?, ?)", args)
+                elif kind == "clear":
+                    conn.execute(
+                        "INSERT INTO clears (user, after_id) SELECT ?, COALESCE(MAX(id), 0) FROM messages", args
+                    )
@@ -0,0 +1,133 @@
+"""Base de conhecimento em arquivo, com índice compacto e respostas mapeadas em memória.
+
+O conteúdo é editado em JSON (`knowledge.json`: {"kb": {...}, "defs": {...}})
+e compilado para um arquivo binário (`.kb`):
+
+    MAGIC | tamanho do índice (uint32 LE) | índice JSON | corpos UTF-8
+
+O índice guarda só (chave, deslocamento, tamanho) de cada resposta; os corpos
+ficam em um `mmap` e são decodificados apenas quando uma resposta é lida.
+
+Como usar:
+ - `python kb.py build knowledge.json knowledge.kb` compila a base.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+
+
+MAGIC = b"CHATTIKB1\n"
+_LEN = struct.Struct("<I")
+SECTIONS = ("kb", "defs")
+
+
+def compile_kb(source, target):
+    """Compila o JSON `source` para o arquivo binário `target` (substituição atômica)."""
+    with open(source, encoding="utf-8") as fh:
+        data = json.load(fh)
+    index = {}
+    bodies = bytearray()
+    for section in SECTIONS:
+        entries = []
+        for key, text in data.get(section, {}).items():
+            raw = text.encode("utf-8")
+            entries.append([key, len(bodies), len(raw)])
+            bodies += raw
+        index[section] = entries
+    header = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(MAGIC + _LEN.pack(len(header)) + header + bodies)
+        # mkstemp cria com 0600; o .kb precisa ser legível por quem roda o servidor.
+        # (Não consulta a umask: os.umask altera o processo todo, com outras threads ativas.)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return target
+
+
+class Section(Mapping):
+    """Mapeamento chave -> resposta de uma seção; decodifica o corpo a cada leitura."""
+
+    def __init__(self, buf, entries, base):
+        self._buf = buf
+        self._spans = {key: (base + off, base + off + size) for key, off, size in entries}
+
+    def __getitem__(self, key):
+        start, end = self._spans[key]
+        return self._buf[start:end].decode("utf-8")
+
+    def __contains__(self, key):
+        return key in self._spans
+
+    def __iter__(self):
+        return iter(self._spans)
+
+    def __len__(self):
+        return len(self._spans)
+
+
+class KnowledgeBase:
+    """Arquivo `.kb` aberto com `mmap`; `kb` e `defs` são objetos `Section`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buf[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: não é um arquivo de base de conhecimento")
+        pos = len(MAGIC)
+        (size,) = _LEN.unpack_from(self._buf, pos)
+        pos += _LEN.size
+        index = json.loads(self._buf[pos:pos + size].decode("utf-8"))
+        base = pos + size
+        self.kb = Section(self._buf, index.get("kb", []), base)
+        self.defs = Section(self._buf, index.get("defs", []), base)
+
+
+def open_kb(path):
+    """Abre a base em `path`; um `.json` é compilado antes para o `.kb` ao lado (se estiver desatualizado)."""
+    if not path.endswith(".json"):
+        return KnowledgeBase(path)
+    target = path[:-len(".json")] + ".kb"
+    try:
+        _refresh(path, target)
+    except OSError:
+        # Diretório sem permissão de escrita: usa sempre o mesmo arquivo no diretório
+        # temporário (um por origem), em vez de criar um novo a cada carga.
+        import hashlib
+        import tempfile
+
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        target = os.path.join(tempfile.gettempdir(), f"chatti-{digest}.kb")
+        _refresh(path, target)
+    return KnowledgeBase(target)
+
+
+def _refresh(source, target):
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+        compile_kb(source, target)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 3 or args[0] != "build":
+        print("uso: python kb.py build <origem.json> <destino.kb>", file=sys.stderr)
+        return 2
+    compile_kb(args[1], args[2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
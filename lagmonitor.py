@@ -0,0 +1,106 @@
+"""Monitor de responsividade do loop de eventos do Tk.
+
+Um batimento agendado com `root.after` a cada `interval_ms` mede o atraso
+(drift) entre o horário previsto e o real; atrasos acima de `stall_ms` contam
+como travamentos e são atribuídos ao handler mais lento que rodou no intervalo.
+Os handlers são medidos quando registrados com `wrap(nome, fn)`. Outros
+componentes podem registrar métricas em `registry`, que entram no log; o
+painel mostra também o `ttfc_ms` do `ResponseDispatcher`.
+
+F12 mostra/oculta um painel com os percentis; com `log_path`, um resumo em JSON
+é anexado ao arquivo a cada `log_every` segundos e ao fechar.
+"""
+import json
+import time
+from collections import deque
+from tkinter import ttk
+
+from metrics import Registry
+
+
+class LagMonitor:
+    def __init__(self, root, interval_ms=50, stall_ms=100, log_path=None, log_every=10.0):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.log_path = log_path
+        self.log_every = log_every
+        self.registry = Registry()
+        self.stalls = deque(maxlen=50)
+        self._slowest = None
+        self._overlay = None
+        self._expected = None
+        self._last_log = time.monotonic()
+        self._last_overlay = 0.0
+        self.root.bind_all("<F12>", lambda e: self.toggle_overlay())
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000.0
+        self.root.after(self.interval_ms, self._beat)
+
+    def wrap(self, name, fn):
+        """Retorna `fn` medido como o handler `name`."""
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - started) * 1000.0
+                self.registry.observe(f"handler.{name}", ms)
+                if self._slowest is None or ms > self._slowest[1]:
+                    self._slowest = (name, ms)
+        return wrapper
+
+    def _beat(self):
+        now = time.perf_counter()
+        drift_ms = max(0.0, (now - self._expected) * 1000.0)
+        self.registry.observe("frame_ms", self.interval_ms + drift_ms)
+        self.registry.observe("drift_ms", drift_ms)
+        if drift_ms >= self.stall_ms:
+            culprit = self._slowest[0] if self._slowest else "desconhecido"
+            self.registry.incr(f"stall.{culprit}")
+            self.stalls.append({"at": time.time(), "drift_ms": round(drift_ms, 1), "handler": culprit})
+        self._slowest = None
+
+        # Reagenda antes do painel e do log: uma falha neles (ex.: arquivo sem
+        # permissão de escrita) não pode parar o batimento pelo resto da sessão.
+        self._expected = time.perf_counter() + self.interval_ms / 1000.0
+        self.root.after(self.interval_ms, self._beat)
+
+        if self._overlay is not None and time.monotonic() - self._last_overlay >= 0.5:
+            self._last_overlay = time.monotonic()
+            self._overlay.configure(text=self.summary())
+        if self.log_path and time.monotonic() - self._last_log >= self.log_every:
+            self.write_log()
+
+    def summary(self):
+        frame = self.registry.histogram("frame_ms").snapshot()
+        if not frame["count"]:
+            return "sem amostras"
+        text = (
+            f"quadro p50 {frame['p50']:.0f} ms | p95 {frame['p95']:.0f} ms | "
+            f"p99 {frame['p99']:.0f} ms | travamentos {len(self.stalls)}"
+        )
+        if self.stalls:
+            last = self.stalls[-1]
+            text += f" (último: {last['handler']}, {last['drift_ms']:.0f} ms)"
+        ttfc = self.registry.histogram("ttfc_ms").snapshot()
+        if ttfc["count"]:
+            text += f"\nprimeiro trecho p50 {ttfc['p50']:.0f} ms | p95 {ttfc['p95']:.0f} ms"
+        return text
+
+    def toggle_overlay(self):
+        if self._overlay is None:
+            self._overlay = ttk.Label(self.root, text=self.summary(), padding=4)
+            self._overlay.place(relx=1.0, rely=0.0, anchor="ne")
+        else:
+            self._overlay.destroy()
+            self._overlay = None
+
+    def write_log(self):
+        self._last_log = time.monotonic()
+        record = self.registry.snapshot()
+        record["at"] = time.time()
+        record["stalls"] = list(self.stalls)
+        with open(self.log_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
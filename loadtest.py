@@ -0,0 +1,236 @@
+"""Teste de carga: simula várias sessões de chat simultâneas contra o motor.
+
+Como usar:
+ - `python loadtest.py --sessions 50 --messages 20` chama `chatbot.get_response`
+   no próprio processo, com uma thread por sessão. Com `--cache` chama
+   `chatbot.cached_response`: o corpus tem poucas centenas de mensagens
+   distintas, então quase tudo vira acerto de cache (o relatório mostra
+   quantas são distintas).
+ - `--mode processes` (sessões divididas entre `--workers` processos) ou
+   `--mode asyncio` (uma tarefa por sessão) mudam o modelo de concorrência.
+ - `--url http://127.0.0.1:8080` envia as mensagens para `server.py` em vez de
+   chamar o motor diretamente.
+
+Cada sessão envia uma sequência realista de mensagens (corpus de `bench.py`)
+com pausas aleatórias (`--think`, média em segundos). O relatório mostra vazão,
+latência (p50/p95/p99/máx), CPU por sessão e o pico de memória (RSS) do
+processo do teste e do maior processo filho (no modo processes). Com `--url`
+esses números são do cliente; os do servidor ficam no próprio servidor.
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import bench
+import chatbot
+from metrics import Histogram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+_CATEGORIES = (
+    "howto_exact@0", "howto_typo@0", "definition_exact@0", "definition_typo@0",
+    "definition_unknown@0", "topic@0", "network@0", "generic@0", "error@0",
+    "error_traceback@1024",
+)
+
+
+def _session_script(corpus, count, rnd):
+    return [rnd.choice(corpus[rnd.choice(_CATEGORIES)]) for _ in range(count)]
+
+
+def _think(rnd, mean):
+    return rnd.expovariate(1.0 / mean) if mean > 0 else 0.0
+
+
+class HttpClient:
+    """Cliente HTTP/1.1 keep-alive para o `POST /chat` de server.py (uma conexão por sessão)."""
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+
+    def __call__(self, message):
+        self.conn.request("POST", "/chat", json.dumps({"message": message}),
+                          {"Content-Type": "application/json"})
+        resp = self.conn.getresponse()
+        body = resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+        return json.loads(body)["response"]
+
+
+def _engine(cache):
+    return chatbot.cached_response if cache else chatbot.get_response
+
+
+def _run_session(script, think, seed, url, cache=False):
+    rnd = random.Random(seed)
+    send = HttpClient(url) if url else _engine(cache)
+    latencies, errors = [], 0
+    for message in script:
+        time.sleep(_think(rnd, think))
+        t0 = time.perf_counter()
+        try:
+            send(message)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t0)
+    return latencies, errors
+
+
+def _run_threads(scripts, think, seed, url, cache=False):
+    with ThreadPoolExecutor(max_workers=len(scripts)) as pool:
+        futures = [pool.submit(_run_session, s, think, seed + i, url, cache) for i, s in enumerate(scripts)]
+        return [f.result() for f in futures]
+
+
+def _process_share(args):
+    scripts, think, seed, url, cache = args
+    return _run_threads(scripts, think, seed, url, cache)
+
+
+def _run_processes(scripts, think, seed, url, workers, cache=False):
+    shares = [scripts[i::workers] for i in range(workers)]
+    jobs = [(share, think, seed + i * len(scripts), url, cache) for i, share in enumerate(shares) if share]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        return [r for chunk in pool.map(_process_share, jobs) for r in chunk]
+
+
+async def _async_http(reader, writer, host, message):
+    body = json.dumps({"message": message}).encode("utf-8")
+    writer.write(
+        f"POST /chat HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}")
+
+
+async def _async_session(script, think, seed, url, cache=False):
+    rnd = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    reader = writer = None
+    if url:
+        parsed = urlparse(url)
+        reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port or 80)
+    latencies, errors = [], 0
+    try:
+        for message in script:
+            await asyncio.sleep(_think(rnd, think))
+            t0 = time.perf_counter()
+            try:
+                if url:
+                    await _async_http(reader, writer, parsed.hostname, message)
+                else:
+                    await loop.run_in_executor(None, _engine(cache), message)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        if writer:
+            writer.close()
+    return latencies, errors
+
+
+async def _run_async(scripts, think, seed, url, cache=False):
+    tasks = [_async_session(s, think, seed + i, url, cache) for i, s in enumerate(scripts)]
+    return await asyncio.gather(*tasks)
+
+
+def _usage():
+    """(CPU em segundos do processo e filhos, pico de RSS em KB do processo, do maior filho).
+
+    `ru_maxrss` é um pico, não um consumo: não dá para subtrair nem dividir por
+    sessão. Sem `resource` as memórias são None.
+    """
+    if resource is None:
+        return time.process_time(), None, None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime
+    scale = 1024 if sys.platform == "darwin" else 1  # macOS informa bytes
+    return cpu, own.ru_maxrss / scale, kids.ru_maxrss / scale
+
+
+def run(sessions=20, messages=20, think=0.1, mode="threads", workers=None, url=None, seed=1, cache=False):
+    corpus = bench.make_corpus(per_category=20, seed=seed)
+    rnd = random.Random(seed)
+    scripts = [_session_script(corpus, messages, rnd) for _ in range(sessions)]
+
+    cpu0, _, _ = _usage()
+    started = time.perf_counter()
+    if mode == "threads":
+        results = _run_threads(scripts, think, seed, url, cache)
+    elif mode == "processes":
+        results = _run_processes(scripts, think, seed, url, workers or os.cpu_count() or 1, cache)
+    elif mode == "asyncio":
+        results = asyncio.run(_run_async(scripts, think, seed, url, cache))
+    else:
+        raise ValueError(f"modo desconhecido: {mode}")
+    elapsed = time.perf_counter() - started
+    cpu1, peak_rss, peak_rss_child = _usage()
+
+    hist = Histogram(size=1_000_000)
+    errors = 0
+    for latencies, errs in results:
+        errors += errs
+        for value in latencies:
+            hist.record(value * 1000.0)
+    snap = hist.snapshot()
+    return {
+        "mode": mode,
+        "target": url or ("in-process, cached_response" if cache else "in-process, get_response"),
+        "sessions": sessions,
+        "unique_messages": len({m for script in scripts for m in script}),
+        "requests": snap["count"],
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": snap["count"] / elapsed if elapsed else 0.0,
+        "latency_ms": {k: snap.get(k, 0.0) for k in ("p50", "p95", "p99", "max")},
+        "cpu_s_per_session": (cpu1 - cpu0) / sessions,
+        "peak_rss_kb": peak_rss,
+        "peak_rss_kb_largest_child": peak_rss_child if mode == "processes" else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do ChatTI com várias sessões simultâneas")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=20, help="mensagens por sessão")
+    parser.add_argument("--think", type=float, default=0.1, help="pausa média entre mensagens (s)")
+    parser.add_argument("--mode", choices=("threads", "processes", "asyncio"), default="threads")
+    parser.add_argument("--workers", type=int, default=None, help="processos no modo processes")
+    parser.add_argument("--url", default=None, help="envia para server.py (ex.: http://127.0.0.1:8080)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache", action="store_true",
+                        help="usa chatbot.cached_response (mede sobretudo acertos de cache)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sessions, args.messages, args.think, args.mode, args.workers, args.url, args.seed,
+                 args.cache)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
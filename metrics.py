@@ -0,0 +1,124 @@
+"""Métricas em processo: contadores e histogramas com percentis.
+
+Usado para medir tempo até o primeiro trecho da resposta, etapas do motor e
+responsividade da interface. Tudo é exportável como dicionário (e JSON).
+"""
+import json
+import threading
+import time
+from collections import deque
+
+
+def _pick(samples, p):
+    return samples[min(len(samples) - 1, int(round(p / 100.0 * (len(samples) - 1))))]
+
+
+class Histogram:
+    """Guarda as últimas `size` amostras e calcula p50/p95/p99 sob demanda."""
+
+    def __init__(self, size=10000):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        return _pick(samples, p) if samples else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total, peak = self.count, self.total, self.max
+        if not samples:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": _pick(samples, 50),
+            "p95": _pick(samples, 95),
+            "p99": _pick(samples, 99),
+            "max": peak,
+        }
+
+
+class Trace:
+    """Cronômetro por etapas: `lap(etapa)` acumula o tempo desde a marca anterior."""
+
+    __slots__ = ("started", "stages", "_last")
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.stages = {}
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+class _NullTrace:
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Registry:
+    """Conjunto nomeado de contadores e histogramas."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram())
+        return hist
+
+    def observe(self, name, value):
+        self.histogram(name).record(value)
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = list(self.histograms.items())
+        return {
+            "counters": counters,
+            "histograms": {name: hist.snapshot() for name, hist in histograms},
+        }
+
+    def dump_json(self, path=None):
+        data = json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(data)
+        return data
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
@@ -0,0 +1,108 @@
+"""Índice invertido incremental sobre as mensagens da conversa.
+
+Cada mensagem recebe no índice um número igual à sua posição no modelo
+(`MessageList.messages`): `add` numera para o fim e `add_older` para o início,
+então a posição de um resultado sai de uma subtração, sem percorrer a lista nem
+os widgets. As palavras são normalizadas com `cache.normalize` (sem acentos,
+maiúsculas nem pontuação), e cada termo da busca casa as palavras que começam
+com ele ("nslook" encontra "nslookup").
+"""
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+from cache import normalize
+
+
+@lru_cache(maxsize=65536)
+def _fold(token):
+    return tuple(normalize(token).split())
+
+
+def _words(text):
+    # Normaliza palavra a palavra (com cache): as conversas repetem muito vocabulário.
+    words = set()
+    for token in text.split():
+        words.update(_fold(token))
+    return words
+
+
+class MessageIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._vocab = []
+        self._docs = {}
+        self._words = {}
+        self._first = 0
+        self._next = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _link(self, doc, words):
+        for word in words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                insort(self._vocab, word)
+            postings.add(doc)
+
+    def _unlink(self, doc, words):
+        for word in words:
+            postings = self._postings[word]
+            postings.discard(doc)
+            if not postings:
+                del self._postings[word]
+                del self._vocab[bisect_left(self._vocab, word)]
+
+    def add(self, message):
+        """Indexa `message` depois de todas as já indexadas."""
+        doc = self._next
+        self._next += 1
+        self._docs[message] = doc
+        self._words[doc] = words = _words(message.text)
+        self._link(doc, words)
+
+    def add_older(self, messages):
+        """Indexa `messages` (da mais antiga para a mais nova) antes de todas as já indexadas."""
+        for message in reversed(messages):
+            self._first -= 1
+            doc = self._first
+            self._docs[message] = doc
+            self._words[doc] = words = _words(message.text)
+            self._link(doc, words)
+
+    def update(self, message):
+        """Reindexa `message` depois que o texto dela mudou (ex.: resposta em streaming)."""
+        doc = self._docs[message]
+        old = self._words[doc]
+        new = _words(message.text)
+        self._unlink(doc, old - new)
+        self._link(doc, new - old)
+        self._words[doc] = new
+
+    def _matching(self, term):
+        """Mensagens com alguma palavra que começa com `term`."""
+        i = bisect_left(self._vocab, term)
+        found = []
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            found.append(self._postings[self._vocab[i]])
+            i += 1
+        if len(found) == 1:
+            return found[0]
+        return set().union(*found)
+
+    def search(self, query):
+        """Posições no modelo, em ordem, das mensagens que contêm todos os termos de `query`."""
+        terms = _words(query)
+        if not terms:
+            return []
+        hits = None
+        for docs in sorted((self._matching(t) for t in terms), key=len):
+            hits = docs if hits is None else hits & docs
+            if not hits:
+                return []
+        first = self._first
+        return [doc - first for doc in sorted(hits)]
@@ -0,0 +1,226 @@
+"""Servidor HTTP/JSON (asyncio, só biblioteca padrão) para o motor de respostas.
+
+Como usar:
+ - Execute `python server.py --port 8080`.
+ - `POST /chat` com corpo `{"message": "o que é docker"}` responde
+   `{"response": "..."}`; `GET /health` retorna o estado e as estatísticas do cache
+   (`null` com `--processes`, em que cada processo tem o seu);
+   `POST /reload` recarrega a base de conhecimento sem interromper as requisições.
+
+As conexões são persistentes (keep-alive). O cálculo das respostas roda em um
+executor, fora do loop de eventos, limitado a `max_concurrency` requisições
+simultâneas; acima de `max_pending` requisições na fila o servidor responde 503.
+O corpo precisa de `Content-Length`: `Transfer-Encoding` (chunked) recebe 501
+e a conexão é fechada.
+Com `--processes N` o executor é um pool de processos, cada um com a sua cópia
+da base: `/reload` recarrega o processo principal e avisa os demais por um
+contador compartilhado, e cada processo recarrega antes da próxima mensagem.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import chatbot
+
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 256 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    501: "Not Implemented",
+    503: "Service Unavailable",
+}
+
+
+# Nos processos do pool: contador de recargas compartilhado com o processo
+# principal e o valor visto na última mensagem.
+_RELOADS = None
+_seen_reloads = 0
+
+
+def _init_worker(reloads):
+    global _RELOADS
+    _RELOADS = reloads
+    chatbot.warm_up()
+
+
+def _worker_response(message):
+    """`chatbot.cached_response` em um processo do pool, recarregando a base se houve `/reload`."""
+    global _seen_reloads
+    current = _RELOADS.value
+    if current != _seen_reloads:
+        chatbot.reload_kb()
+        _seen_reloads = current
+    return chatbot.cached_response(message)
+
+
+def process_executor(processes):
+    """Pool de `processes` processos; retorna (executor, contador de recargas)."""
+    import multiprocessing
+
+    reloads = multiprocessing.Value("i", 0)
+    executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(reloads,))
+    return executor, reloads
+
+
+class ChatServer:
+    def __init__(self, max_concurrency=32, max_pending=1024, idle_timeout=15.0, executor=None, reloads=None):
+        self.max_pending = max_pending
+        self.idle_timeout = idle_timeout
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrency)
+        # Contador compartilhado com o pool de processos (None com threads).
+        self.reloads = reloads
+        self._respond = chatbot.cached_response if reloads is None else _worker_response
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending = 0
+
+    async def respond(self, message):
+        """Calcula a resposta no executor, respeitando o limite de concorrência."""
+        if self._pending >= self.max_pending:
+            return None
+        self._pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, self._respond, message)
+        finally:
+            self._pending -= 1
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "requisição inválida"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+
+                if "transfer-encoding" in headers:
+                    # Sem suporte a corpo em chunks: o resto da conexão não pode ser interpretado.
+                    await self._send(writer, 501, {"error": "Transfer-Encoding não suportado"}, keep_alive=False)
+                    break
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Content-Length inválido"}, keep_alive=False)
+                    break
+                if length < 0:
+                    await self._send(writer, 400, {"error": "Content-Length inválido"}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._send(writer, 413, {"error": "corpo muito grande"}, keep_alive=False)
+                    break
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout) if length else b""
+                except asyncio.TimeoutError:
+                    break
+
+                try:
+                    status, payload = await self._route(method, path, body)
+                except Exception as exc:
+                    # Ex.: /reload com a base ausente ou inválida; a conexão continua utilizável.
+                    status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            # Com um pool de processos cada um tem o seu cache, inacessível daqui.
+            cache = None if self.reloads is not None else chatbot.cache_stats()
+            return 200, {"status": "ok", "pending": self._pending, "cache": cache}
+        if path == "/reload":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            loop = asyncio.get_running_loop()
+            know = await loop.run_in_executor(None, chatbot.reload_kb)
+            if self.reloads is not None:
+                # Só avisa o pool depois que a nova base carregou sem erro aqui.
+                with self.reloads.get_lock():
+                    self.reloads.value += 1
+            return 200, {"status": "ok", "kb": len(know.kb), "defs": len(know.defs)}
+        if path != "/chat":
+            return 404, {"error": "rota não encontrada"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            message = json.loads(body or b"{}").get("message", "")
+        except (ValueError, AttributeError):
+            return 400, {"error": "JSON inválido"}
+        if message is None:
+            message = ""
+        if not isinstance(message, str):
+            return 400, {"error": "o campo message deve ser uma string"}
+        resp = await self.respond(message)
+        if resp is None:
+            return 503, {"error": "servidor ocupado, tente novamente"}
+        return 200, {"response": resp}
+
+    async def _send(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        writer.write(head + data)
+        # drain() suspende esta conexão enquanto o cliente não consome a resposta
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8080, **kwargs):
+    app = ChatServer(**kwargs)
+    # A base é carregada sob demanda; carregá-la aqui evita que a primeira requisição pague o custo.
+    chatbot.warm_up()
+    server = await asyncio.start_server(app.handle, host, port, limit=MAX_HEADER_BYTES, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON do ChatTI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=1024)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="usa um pool de N processos em vez de threads (contorna o GIL)")
+    args = parser.parse_args(argv)
+
+    executor, reloads = process_executor(args.processes) if args.processes else (None, None)
+    try:
+        asyncio.run(serve(args.host, args.port, max_concurrency=args.max_concurrency,
+                          max_pending=args.max_pending, executor=executor, reloads=reloads))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import unittest
+
+import chatbot
+from cache import ResponseCache, normalize
+
+
+_VARIANTS = (
+    ("oque é docker", "oque e docker", "OQUE E DOCKER?"),
+    ("o que é programação", "o que e programacao", "O que é Programação?!"),
+    ("O que é Docker?", "o que e docker", "o  que  é  docker"),
+    ("como instalar python", "Como instalar Python?", "como  instalar  PYTHON"),
+    ("como faço para usar git", "como faco para usar git"),
+    ("deu erro no pip", "Deu ERRO no pip!"),
+)
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_folds_case_accents_and_punctuation(self):
+        self.assertEqual(normalize("  O que é  Programação?! "), "o que e programacao")
+        self.assertEqual(normalize("c++ e node-js"), "c++ e node-js")
+        self.assertEqual(normalize(None), "")
+
+
+class CachedResponseTest(unittest.TestCase):
+    def setUp(self):
+        chatbot.knowledge().cache.clear()
+
+    def test_cached_matches_engine_for_folded_variants(self):
+        for group in _VARIANTS:
+            for order in (group, group[::-1]):
+                chatbot.knowledge().cache.clear()
+                for message in order:
+                    with self.subTest(message=message, first=order[0]):
+                        self.assertEqual(chatbot.cached_response(message), chatbot.get_response(message))
+
+    def test_folded_variants_get_the_same_answer(self):
+        for group in _VARIANTS:
+            with self.subTest(group=group):
+                self.assertEqual(len({chatbot.get_response(m) for m in group}), 1)
+
+
+class ReloadTest(unittest.TestCase):
+    def test_reload_starts_an_empty_cache_for_the_new_version(self):
+        old = chatbot.knowledge()
+        chatbot.cached_response("o que é docker")
+        fresh = chatbot.reload_kb()
+        self.assertIsNot(fresh.cache, old.cache)
+        self.assertEqual(chatbot.cache_stats()["size"], 0)
+        # Uma resposta atrasada da versão anterior fica no cache dela, não no da nova.
+        old.cache.put("o que e docker", "resposta antiga")
+        self.assertNotEqual(chatbot.cached_response("o que é docker"), "resposta antiga")
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = ResponseCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
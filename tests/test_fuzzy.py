@@ -0,0 +1,89 @@
+import random
+import string
+import unittest
+from difflib import get_close_matches
+
+import chatbot
+from fuzzy import FuzzyIndex
+
+
+def _typos(word):
+    """Todas as variantes de `word` com um erro: letra a menos, a mais, trocada ou invertida."""
+    letters = "aeiorstnx"
+    out = set()
+    for i in range(len(word) + 1):
+        out.update(word[:i] + c + word[i:] for c in letters)
+        if i < len(word):
+            out.add(word[:i] + word[i + 1:])
+            out.update(word[:i] + c + word[i + 1:] for c in letters)
+        if i < len(word) - 1:
+            out.add(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    out.discard("")
+    return sorted(out)
+
+
+def _expected(word, keys, cutoff):
+    found = get_close_matches(word, keys, n=1, cutoff=cutoff)
+    return found[0] if found else None
+
+
+class FuzzyIndexTest(unittest.TestCase):
+    def assertSameAsDifflib(self, keys, words):
+        index = FuzzyIndex(keys)
+        for word in words:
+            for cutoff in (0.6, 0.7):
+                with self.subTest(word=word, cutoff=cutoff):
+                    self.assertEqual(index.best(word, cutoff), _expected(word, keys, cutoff))
+
+    def test_knowledge_base_typos(self):
+        know = chatbot.knowledge()
+        for section in (know.kb, know.defs):
+            keys = list(section)
+            words = [typo for key in keys for typo in _typos(key)]
+            self.assertSameAsDifflib(keys, keys + words)
+
+    def test_engine_tokens(self):
+        tokens = "docker dokcer pyhton gti linx redes nslookup js node xyz a o que e".split()
+        know = chatbot.knowledge()
+        self.assertSameAsDifflib(list(know.kb), tokens)
+        self.assertSameAsDifflib(list(know.defs), tokens)
+
+    def test_random_keys(self):
+        rnd = random.Random(7)
+        keys = ["".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(3, 12)))
+                for _ in range(2000)]
+        words = [rnd.choice(_typos(rnd.choice(keys))) for _ in range(300)]
+        self.assertSameAsDifflib(keys, words)
+
+    def test_multi_edit_queries(self):
+        self.assertSameAsDifflib(["ram", "gpu", "js", "git"], ["sramw", "gmpuw", "bjps", "gti", "gti gti"])
+        know = chatbot.knowledge()
+        rnd = random.Random(11)
+        for section in (know.kb, know.defs):
+            keys = list(section)
+            words = []
+            for _ in range(1500):
+                word = rnd.choice(keys)
+                for _ in range(rnd.randint(1, 3)):
+                    word = rnd.choice(_typos(word))
+                words.append(word)
+            self.assertSameAsDifflib(keys, words)
+
+    def test_random_keys_multi_edit(self):
+        rnd = random.Random(13)
+        keys = ["".join(rnd.choice("abcdeilmnorstu") for _ in range(rnd.randint(1, 14))) for _ in range(1500)]
+        words = []
+        for _ in range(300):
+            word = rnd.choice(keys)
+            for _ in range(rnd.randint(1, 4)):
+                word = rnd.choice(_typos(word))
+            words.append(word)
+        self.assertSameAsDifflib(keys, words)
+
+    def test_empty(self):
+        self.assertIsNone(FuzzyIndex([]).best("docker"))
+        self.assertIsNone(FuzzyIndex(["docker"]).best(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
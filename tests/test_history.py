@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from history import HistoryStore
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.store = HistoryStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def _add(self, user, *texts):
+        for text in texts:
+            self.store.append(user, "user", user, text, "00:00")
+
+    def _texts(self, rows):
+        return [row.text for row in rows]
+
+    def test_pages_from_newest(self):
+        self._add("ana", *map(str, range(7)))
+        self.store.flush()
+        page = self.store.load_page("ana", limit=3)
+        self.assertEqual(self._texts(page), ["4", "5", "6"])
+        older = self.store.load_page("ana", before_id=page[0].id, limit=3)
+        self.assertEqual(self._texts(older), ["1", "2", "3"])
+
+    def test_clear_hides_earlier_messages_without_deleting(self):
+        self._add("ana", "a1", "a2")
+        self._add("bia", "b1")
+        self.store.clear("ana")
+        self._add("ana", "a3")
+        self.store.flush()
+        page = self.store.load_page("ana")
+        self.assertEqual(self._texts(page), ["a3"])
+        self.assertEqual(self.store.load_page("ana", before_id=page[0].id), [])
+        self.assertEqual(self._texts(self.store.load_page("bia")), ["b1"])
+        with sqlite3.connect(self.path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 4)
+
+    def test_clear_keeps_queue_order(self):
+        self._add("ana", "a1")
+        self.store.clear("ana")
+        self.store.clear("ana")
+        self._add("ana", "a2", "a3")
+        self.store.flush()
+        self.assertEqual(self._texts(self.store.load_page("ana")), ["a2", "a3"])
+
+    def test_failed_write_keeps_the_writer_running(self):
+        self._add("ana", "a1")
+        self.store.append("ana", "user", None, "falha", "00:00")  # name é NOT NULL
+        self._add("ana", "a2")
+        with self.assertLogs("history", "ERROR"):
+            self.store.flush()
+        self._add("ana", "a3")
+        self.store.flush()
+        self.assertEqual(self._texts(self.store.load_page("ana")), ["a1", "a2", "a3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import random
+import unittest
+from collections import defaultdict
+
+import chatbot
+from cache import normalize
+from retrieval import RetrievalIndex
+
+
+def _brute_force(index, text, k, min_score=0.0):
+    """Pontua todas as entradas, sem poda: a referência de `RetrievalIndex.search`."""
+    scores = defaultdict(float)
+    for g, qw in index._query_vector(text).items():
+        ids, weights = index._postings[g]
+        for doc_id, w in zip(ids, weights):
+            scores[doc_id] += qw * w
+    best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+    return [(index._keys[i], round(score, 9)) for i, score in best if score > min_score]
+
+
+class RetrievalIndexTest(unittest.TestCase):
+    def assertSameAsBruteForce(self, index, queries, k=5, min_score=0.0):
+        for text in queries:
+            with self.subTest(text=text, k=k):
+                hits = index.search(text, k=k, min_score=min_score)
+                self.assertEqual([(h.key, round(h.score, 9)) for h in hits],
+                                 _brute_force(index, text, k, min_score))
+
+    def test_knowledge_base(self):
+        know = chatbot.knowledge()
+        index = know.retrieval
+        queries = ["o que é docker", "como instalar python no linux", "erro de permissão",
+                   "ping não responde", "xyz"] + list(know.kb) + list(know.defs)
+        for k in (1, 5, 200):
+            self.assertSameAsBruteForce(index, queries, k=k)
+        self.assertSameAsBruteForce(index, queries, min_score=0.25)
+
+    def test_random_corpus(self):
+        rnd = random.Random(5)
+        vocab = ["".join(rnd.choice("abcdeilmnoprstu") for _ in range(rnd.randint(2, 8))) for _ in range(400)]
+        weights = [1.0 / (r + 1) for r in range(len(vocab))]
+        section = {f"k{i}": " ".join(rnd.choices(vocab, weights, k=rnd.randint(5, 30))) for i in range(1500)}
+        index = RetrievalIndex({"kb": section})
+        queries = [" ".join(rnd.choices(vocab, weights, k=rnd.randint(1, 6))) for _ in range(150)]
+        self.assertSameAsBruteForce(index, queries, k=5)
+        self.assertSameAsBruteForce(index, queries[:30], k=1)
+
+    def test_accents_are_folded_in_index_and_query(self):
+        index = RetrievalIndex({"kb": {"deploy": "Docker empacota aplicações e dependências."}})
+        accented, = index.search("aplicações")
+        folded, = index.search("APLICACOES!")
+        self.assertEqual(accented.score, folded.score)
+        self.assertEqual(folded.answer, "Docker empacota aplicações e dependências.")
+        text = "Como instalar Python?"
+        self.assertEqual(chatbot.search(text), chatbot.knowledge().retrieval.search(normalize(text)))
+
+    def test_empty(self):
+        self.assertEqual(RetrievalIndex({}).search("docker"), [])
+        self.assertEqual(chatbot.knowledge().retrieval.search("", k=5), [])
+        self.assertEqual(chatbot.knowledge().retrieval.search("docker", k=0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
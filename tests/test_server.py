@@ -0,0 +1,85 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import chatbot
+import server
+
+
+class ChatServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.app = server.ChatServer(max_concurrency=2, idle_timeout=1.0)
+        self.server = await asyncio.start_server(self.app.handle, "127.0.0.1", 0, limit=server.MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.app.executor.shutdown(wait=False)
+
+    async def _exchange(self, *requests):
+        """Envia `requests` (bytes) em uma conexão e retorna [(status, corpo JSON)] até ela fechar."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        responses = []
+        try:
+            for data in requests:
+                writer.write(data)
+                await writer.drain()
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+                except asyncio.IncompleteReadError:
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                status = int(lines[0].split(" ")[1])
+                length = next(int(line.split(":", 1)[1]) for line in lines if line.lower().startswith("content-length:"))
+                responses.append((status, json.loads(await reader.readexactly(length))))
+        finally:
+            writer.close()
+        return responses
+
+    @staticmethod
+    def _post(path, payload=None, raw=None, headers=""):
+        body = raw if raw is not None else json.dumps(payload).encode("utf-8")
+        return (f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n{headers}\r\n").encode("latin-1") + body
+
+    async def test_chat_and_keep_alive(self):
+        responses = await self._exchange(
+            self._post("/chat", {"message": "o que é docker"}),
+            b"GET /health HTTP/1.1\r\n\r\n",
+        )
+        self.assertEqual(responses[0], (200, {"response": chatbot.cached_response("o que é docker")}))
+        self.assertEqual(responses[1][0], 200)
+
+    async def test_null_message_is_empty(self):
+        (status, payload), = await self._exchange(self._post("/chat", {"message": None}))
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["response"], chatbot.get_response(""))
+
+    async def test_non_string_message_is_rejected(self):
+        responses = await self._exchange(
+            self._post("/chat", {"message": ["docker"]}),
+            self._post("/chat", {"message": "o que é git"}),
+        )
+        self.assertEqual([status for status, _ in responses], [400, 200])
+
+    async def test_negative_content_length(self):
+        responses = await self._exchange(b"POST /chat HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+        self.assertEqual(responses[0][0], 400)
+
+    async def test_chunked_body_is_rejected(self):
+        responses = await self._exchange(
+            b"POST /chat HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n",
+            b"GET /health HTTP/1.1\r\n\r\n",
+        )
+        self.assertEqual([status for status, _ in responses], [501])
+
+    async def test_failed_reload_answers_500_and_keeps_the_connection(self):
+        with mock.patch.object(chatbot, "reload_kb", side_effect=FileNotFoundError("knowledge.json")):
+            responses = await self._exchange(self._post("/reload", raw=b""), b"GET /health HTTP/1.1\r\n\r\n")
+        self.assertEqual([status for status, _ in responses], [500, 200])
+        self.assertIn("FileNotFoundError", responses[0][1]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
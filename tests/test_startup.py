@@ -0,0 +1,24 @@
+import unittest
+
+import bench
+
+
+class StartupTest(unittest.TestCase):
+    """Mesmas verificações de `python bench.py --startup`, com o melhor de 3 execuções."""
+
+    def test_import_chatbot_is_fast_and_defers_heavy_modules(self):
+        runs = [bench.import_time() for _ in range(3)]
+        loaded = sorted({m for _, mods in runs for m in mods})
+        self.assertEqual(loaded, [], "import chatbot carregou módulos adiados")
+        self.assertLessEqual(min(ms for ms, _ in runs), bench.IMPORT_BUDGET_MS)
+
+    def test_login_window(self):
+        first = bench.login_time()
+        if first is None:
+            self.skipTest("sem display")
+        best = min([first] + [bench.login_time() for _ in range(2)])
+        self.assertLessEqual(best, bench.LOGIN_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import io
+import json
+import unittest
+
+import chatbot
+
+
+def _run(text, **kwargs):
+    out = io.StringIO()
+    chatbot.run_stream(io.StringIO(text), out, **kwargs)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class RunStreamTest(unittest.TestCase):
+    def test_object_with_its_own_error_field_is_answered(self):
+        rows = _run('{"message": "o que é docker", "error": null}\n')
+        self.assertIsNone(rows[0]["error"])
+        self.assertEqual(rows[0]["response"], chatbot.get_response("o que é docker"))
+
+    def test_invalid_lines_keep_their_position(self):
+        rows = _run('{"message": "o que é git"}\nnão é json\n[1, 2]\n"como instalar python"\n')
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]["response"], chatbot.get_response("o que é git"))
+        self.assertNotIn("response", rows[1])
+        self.assertTrue(rows[1]["error"].startswith("JSON inválido"))
+        self.assertNotIn("response", rows[2])
+        self.assertEqual(rows[3]["response"], chatbot.get_response("como instalar python"))
+
+    def test_plain_text(self):
+        rows = _run("o que é docker\n\ncomo instalar python\n", jsonl=False)
+        self.assertEqual([r["message"] for r in rows], ["o que é docker", "como instalar python"])
+        self.assertTrue(all("response" in r for r in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()